@@ -0,0 +1,128 @@
+"""
+Benchmark: monthly analyses on the wide (Year, Branch) frame vs the revenue cube
+Run: python benchmarks/bench_cube.py [n_branches] [n_years]
+
+Builds a synthetic wide monthly frame shaped like REP_S_00134 and times the
+seasonality / YoY / first-active-month analyses the old way (month-name column
+loops, merge, iterrows) against the cube axis reductions, then a YoY table for
+every month and year pair as one merge per month and pair vs `cube.yoy`.
+"""
+
+import os
+import sys
+import time
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stories_io import cube
+from stories_io.parsers import MONTHS
+
+REPEATS = 5
+
+
+def synthetic_monthly(n_branches, n_years, seed=0):
+    rng = np.random.default_rng(seed)
+    years = np.repeat(np.arange(2025 - n_years + 1, 2026), n_branches)
+    branches = np.tile([f'Branch {i:04d}' for i in range(n_branches)], n_years)
+    values = rng.gamma(2.0, 2e6, size=(len(years), 12))
+    # Stagger openings so first-active-month has work to do
+    opened = rng.integers(0, 12, size=len(years))
+    values[np.arange(12) < opened[:, None]] = 0.0
+    df = pd.DataFrame(values, columns=MONTHS)
+    df.insert(0, 'Branch', branches)
+    df.insert(0, 'Year', years)
+    df['Total By Year'] = values.sum(axis=1)
+    return df
+
+
+def month_compare(prev, curr, prev_year, curr_year, month='January'):
+    """The merge-based comparison cube.month_compare replaced."""
+    a_col, b_col = f'{month[:3]}_{prev_year}', f'{month[:3]}_{curr_year}'
+    a = prev[['Branch', month]].rename(columns={month: a_col})
+    b = curr[['Branch', month]].rename(columns={month: b_col})
+    df = a.merge(b, on='Branch', how='inner')
+    df = df[(df[a_col] > 0) & (df[b_col] > 0)]
+    df['YoY Change %'] = (df[b_col] - df[a_col]) / df[a_col] * 100
+    return df.sort_values('YoY Change %', ascending=False)
+
+
+def frame_analyses(df_monthly, prev_year, curr_year):
+    df_prev = df_monthly[df_monthly['Year'] == prev_year]
+    df_curr = df_monthly[df_monthly['Year'] == curr_year]
+    monthly_totals = {m: df_curr[m].sum() for m in MONTHS if m in df_curr.columns}
+    peak = max(monthly_totals, key=monthly_totals.get)
+    jan = month_compare(df_prev, df_curr, prev_year, curr_year)
+    new = []
+    for _, row in df_curr.iterrows():
+        for m in MONTHS:
+            if row[m] > 0:
+                if m != 'January':
+                    new.append(row['Branch'])
+                break
+    return peak, len(jan), len(new)
+
+
+def cube_analyses(revenue_cube, prev_year, curr_year):
+    peak, _ = cube.peak_trough(revenue_cube, curr_year)
+    jan = cube.month_compare(revenue_cube, prev_year, curr_year)
+    new = cube.new_branches(revenue_cube, curr_year)
+    return peak, len(jan), len(new)
+
+
+def frame_yoy(df_monthly, years):
+    parts = []
+    for a, b in combinations(years, 2):
+        prev, curr = df_monthly[df_monthly['Year'] == a], df_monthly[df_monthly['Year'] == b]
+        for m in MONTHS:
+            parts.append(month_compare(prev, curr, a, b, m))
+    return sum(len(p) for p in parts)
+
+
+def cube_yoy(revenue_cube):
+    return len(cube.yoy(revenue_cube))
+
+
+def best_of(fn, *args):
+    times = []
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+
+def main():
+    n_branches = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    n_years = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    df = synthetic_monthly(n_branches, n_years)
+
+    print("=" * 60)
+    print(f"REVENUE CUBE BENCHMARK: {n_branches} branches x {n_years} years")
+    print("=" * 60)
+
+    t_build, revenue_cube = best_of(cube.build_cube, df)
+    t_frame, r_frame = best_of(frame_analyses, df, 2024, 2025)
+    t_cube, r_cube = best_of(cube_analyses, revenue_cube, 2024, 2025)
+
+    frame_mb = df.memory_usage(deep=True).sum() / 1e6
+    cube_mb = (revenue_cube.values.nbytes + revenue_cube.totals.nbytes + revenue_cube.present.nbytes) / 1e6
+
+    print(f"  {'wide frame memory':24s}: {frame_mb:>8.2f} MB")
+    print(f"  {'cube memory':24s}: {cube_mb:>8.2f} MB")
+    print(f"  {'cube build':24s}: {t_build*1000:>8.2f} ms")
+    print(f"  {'analyses on frame':24s}: {t_frame*1000:>8.2f} ms")
+    print(f"  {'analyses on cube':24s}: {t_cube*1000:>8.2f} ms  ({t_frame/t_cube:.0f}x faster)")
+    print(f"  {'results match':24s}: {r_frame == r_cube}")
+
+    t_frame, r_frame = best_of(frame_yoy, df, revenue_cube.years)
+    t_cube, r_cube = best_of(cube_yoy, revenue_cube)
+    print(f"  {'all-month YoY, merges':24s}: {t_frame*1000:>8.2f} ms")
+    print(f"  {'all-month YoY, cube':24s}: {t_cube*1000:>8.2f} ms  ({t_frame/t_cube:.0f}x faster)")
+    print(f"  {'rows match':24s}: {r_frame == r_cube}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark: cold-start import cost of the entry points (python -X importtime)
+Run: python benchmarks/bench_imports.py [--repeats 5] [--output FILE]
+
+Every target is imported in a fresh interpreter under -X importtime; the
+import time is the sum of its top-level imports (modules the bare interpreter
+already loads at startup are left out) and the fastest of `--repeats` runs
+counts. Per target it lists the heaviest packages by self time and which of
+the heavy stacks (pandas, matplotlib, seaborn, plotly.express, ReportLab,
+svglib) got loaded at all (streamlit imports the plotly base itself, so for
+plotly it is plotly.express that counts). The dashboard is a Streamlit
+script, so it is measured by its module-level imports plus those of each
+page, read from its source rather than by running it.
+"""
+
+import argparse
+import ast
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    'stories_io.instrument', 'stories_io.parsers', 'analysis', 'charts',
+    'exec_summary', 'run_report', 'branch_summary',
+]
+HEAVY = ['pandas', 'matplotlib', 'seaborn', 'plotly.express', 'reportlab', 'svglib']
+
+
+def dashboard_targets(path=os.path.join(ROOT, 'dashboard.py')):
+    """(name, code) for the dashboard's boot imports and each page's on top of them."""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    imports = lambda body: [ast.unparse(n) for n in body if isinstance(n, (ast.Import, ast.ImportFrom))]
+    header = imports(tree.body)
+    targets = [('dashboard', '\n'.join(header))]
+    node = next((n for n in tree.body if isinstance(n, ast.If) and 'page' in ast.unparse(n.test)), None)
+    while isinstance(node, ast.If):
+        page = node.test.comparators[0].value
+        targets.append((f'dashboard: {page}', '\n'.join(header + imports(node.body))))
+        node = node.orelse[0] if len(node.orelse) == 1 else None
+    return targets
+
+
+def importtime(code):
+    """Run `code` under -X importtime; returns (entries, wall seconds) with entries (depth, name, self_us, cum_us)."""
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cum_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((depth, name.strip(), int(self_us), int(cum_us)))
+    return entries, wall
+
+
+def measure(code, baseline, repeats):
+    best = None
+    for _ in range(repeats):
+        entries, wall = importtime(code)
+        entries = [e for e in entries if not (e[0] == 0 and e[1] in baseline)]
+        total = sum(cum for depth, _, _, cum in entries if depth == 0) / 1e6
+        if best is None or total < best[0]:
+            best = (total, wall, entries)
+    total, wall, entries = best
+    by_package = defaultdict(int)
+    for _, name, self_us, _ in entries:
+        by_package[name.split('.')[0]] += self_us
+    loaded = lambda pkg: any(name == pkg or name.startswith(pkg + '.') for _, name, _, _ in entries)
+    return {
+        'import_seconds': total,
+        'process_seconds': wall,
+        'modules': len(entries),
+        'heavy_loaded': [pkg for pkg in HEAVY if loaded(pkg)],
+        'top_packages': [(pkg, us / 1e6) for pkg, us in sorted(by_package.items(), key=lambda kv: -kv[1])[:5]],
+    }
+
+
+def run(repeats):
+    baseline = {name for depth, name, _, _ in importtime('pass')[0] if depth == 0}
+    targets = [(m, f'import {m}') for m in MODULES] + dashboard_targets()
+    results = []
+    print("=" * 96)
+    print(f"IMPORT-TIME BENCHMARK: fresh interpreter per target, best of {repeats}")
+    print("=" * 96)
+    print(f"  {'target':34s} {'import':>8s} {'process':>8s} {'modules':>8s}  heavy stacks loaded")
+    for name, code in targets:
+        entry = {'target': name, 'code': code}
+        try:
+            entry.update(measure(code, baseline, repeats))
+        except RuntimeError as e:
+            entry['error'] = str(e)
+            print(f"  {name:34s} ERROR: {e}")
+        else:
+            print(f"  {name:34s} {entry['import_seconds']:>7.3f}s {entry['process_seconds']:>7.3f}s"
+                  f" {entry['modules']:>8d}  {', '.join(entry['heavy_loaded']) or '-'}")
+            print(f"  {'':34s} heaviest: " + ', '.join(f'{pkg} {s * 1000:.0f}ms' for pkg, s in entry['top_packages']))
+        results.append(entry)
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Measure the cold-start import cost of the entry points.')
+    ap.add_argument('--repeats', type=int, default=5, help='fresh interpreters per target; the fastest counts')
+    ap.add_argument('--output', default='bench_imports.json', help='JSON results file')
+    args = ap.parse_args()
+
+    started = datetime.datetime.now().isoformat(timespec='seconds')
+    results = run(args.repeats)
+    report = {
+        'benchmark': 'imports',
+        'started': started,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeats': args.repeats,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    return 1 if any('error' in r for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Benchmark: product / group frame footprint and groupby time, string vs compact dtypes
+Run: python benchmarks/bench_memory.py [data_dir]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stories_io.dtypes import memory_mb
+from stories_io.parsers import report_paths, parse_product_profit, parse_group_sales
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPEATS = 20
+
+FRAMES = [
+    ('products', parse_product_profit, ['Branch', 'Category'], ['Qty', 'Revenue']),
+    ('groups', parse_group_sales, ['Branch', 'Group'], ['Qty', 'Total Amount']),
+]
+
+
+def groupby_time(df, keys, values):
+    times = []
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        df.groupby(keys, observed=True)[values].sum()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main():
+    paths = report_paths(sys.argv[1] if len(sys.argv) > 1 else ROOT)
+
+    print("=" * 60)
+    print("FRAME MEMORY BENCHMARK: string/float64 vs category/float32")
+    print("=" * 60)
+
+    for report, parse, keys, values in FRAMES:
+        before = parse(paths[report], compact_dtypes=False)
+        after = parse(paths[report])
+        t_before = groupby_time(before, keys, values)
+        t_after = groupby_time(after, keys, values)
+
+        print(f"\n{report} ({len(after):,} rows)")
+        print(f"  {'memory':24s}: {memory_mb(before):>8.2f} MB -> {memory_mb(after):>6.2f} MB"
+              f"  ({memory_mb(before)/memory_mb(after):.1f}x smaller)")
+        print(f"  {'groupby ' + '/'.join(keys):24s}: {t_before*1000:>8.2f} ms -> {t_after*1000:>6.2f} ms"
+              f"  ({t_before/t_after:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
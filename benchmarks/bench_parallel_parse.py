@@ -0,0 +1,117 @@
+"""
+Benchmark: branch-split parallel parsing of the item and group exports vs worker count
+Run: python benchmarks/bench_parallel_parse.py [--scale 100] [--workers 1 2 4 8 16] [--repeats 1] [--output FILE]
+
+The item and group exports are generated (synth_exports.py) with `--scale`
+times the branches, then each is parsed by stories_io.parallel.parse_parallel
+at every worker count in a fresh child process (1 worker is the serial
+parser). Prints best-of-`--repeats` seconds, speedup over 1 worker and
+parallel efficiency (speedup / workers), checks every run returns the serial
+row count and writes the results to a JSON file. Worker counts above the
+machine's CPU count are run but only measure overhead.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import synth_exports
+
+REPORTS = ['products', 'groups']
+
+
+def child(report, path, workers, repeats):
+    """Runs in the child process: parse `path` on `workers` processes, print one JSON line."""
+    from stories_io import parallel
+    parallel.MIN_PARALLEL_BYTES = 0  # measure the pool at every scale
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        df = parallel.parse_parallel(report, path, workers=workers)
+        times.append(time.perf_counter() - t0)
+    print(json.dumps({'rows': len(df), 'seconds': min(times)}))
+
+
+def measure(report, path, workers, repeats):
+    cmd = [sys.executable, os.path.abspath(__file__), '--child', report, path, str(workers), str(repeats)]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        lines = (proc.stderr.strip() or f'exit code {proc.returncode}').splitlines()
+        return {'status': 'error', 'error': lines[-1] if lines else ''}
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['status'] = 'ok'
+    return result
+
+
+def run(scale, worker_counts, repeats, seed=0):
+    out_dir = tempfile.mkdtemp(prefix='stories-bench-')
+    paths = synth_exports.write_reports(out_dir, branches=scale, seed=seed)
+    results = []
+    print("=" * 80)
+    print(f"PARALLEL PARSE BENCHMARK: {scale:g}x branches, best of {repeats}, {os.cpu_count()} CPUs")
+    print("=" * 80)
+    print(f"  {'report':9s} {'MB':>7s} {'workers':>8s} {'seconds':>9s} {'speedup':>8s} {'efficiency':>11s}")
+    try:
+        for report in REPORTS:
+            size = os.path.getsize(paths[report])
+            base = None
+            for workers in worker_counts:
+                entry = {'report': report, 'scale': scale, 'file_bytes': size, 'workers': workers}
+                entry.update(measure(report, paths[report], workers, repeats))
+                if entry['status'] != 'ok':
+                    print(f"  {report:9s} {size/1e6:>7.1f} {workers:>8d}  ERROR: {entry['error']}")
+                    results.append(entry)
+                    continue
+                base = base or entry
+                entry['speedup'] = base['seconds'] / entry['seconds']
+                entry['efficiency'] = entry['speedup'] / (workers / base['workers'])
+                entry['rows_match'] = entry['rows'] == base['rows']
+                print(f"  {report:9s} {size/1e6:>7.1f} {workers:>8d} {entry['seconds']:>9.3f}"
+                      f" {entry['speedup']:>7.2f}x {entry['efficiency']:>10.0%}"
+                      f"{'' if entry['rows_match'] else '   ROW COUNT DIFFERS'}")
+                results.append(entry)
+    finally:
+        shutil.rmtree(out_dir)
+    return results
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        return child(sys.argv[2], sys.argv[3], int(sys.argv[4]), int(sys.argv[5]))
+
+    ap = argparse.ArgumentParser(description='Time the branch-split parallel parser at several worker counts.')
+    ap.add_argument('--scale', type=float, default=100, help='factor on the real exports\' branch count')
+    ap.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    ap.add_argument('--repeats', type=int, default=1, help='parses per worker count; the fastest counts')
+    ap.add_argument('--output', default='bench_parallel_parse.json', help='JSON results file')
+    ap.add_argument('--seed', type=int, default=0)
+    args = ap.parse_args()
+
+    started = datetime.datetime.now().isoformat(timespec='seconds')
+    results = run(args.scale, args.workers, args.repeats, args.seed)
+    report = {
+        'benchmark': 'parallel_parse',
+        'started': started,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'scale': args.scale,
+        'repeats': args.repeats,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    return 1 if any(r['status'] != 'ok' or not r.get('rows_match') for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Benchmark: the four report parsers on synthetic exports at growing scale
+Run: python benchmarks/bench_parsers.py [--scales 1 10 100] [--axis branches|products|months] [--stream [PAGES]] [--output FILE]
+
+For each scale the four exports are generated (synth_exports.py) with that
+factor on `--axis`, then every loader parses its file in a fresh child
+process: best-of-`--repeats` parse time, rows/sec, MB/sec and the child's
+peak RSS (with its RSS after the imports, so the parse's own share is the
+difference). A loader that raises, is killed (e.g. out of memory) or runs
+past `--timeout` is recorded with its status instead of ending the run.
+Results are printed as they come and written to a JSON file. With
+`--stream` the item, group and category reports are read page-chunked by
+stories_io.stream into part files instead (the monthly report is unchanged).
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import synth_exports
+
+LOADERS = {
+    'monthly': 'parse_monthly_sales',
+    'products': 'parse_product_profit',
+    'groups': 'parse_group_sales',
+    'category': 'parse_category_profit',
+}
+
+
+def rss_mb():
+    """Peak RSS of this process so far (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def child(report, path, repeats, pages=0):
+    """Runs in the child process: parse `path` `repeats` times, print one JSON line."""
+    from stories_io import parsers, stream
+    parse = getattr(parsers, LOADERS[report])
+    if pages and report in parsers.ROW_BUILDERS:
+        def parse(path):
+            out_dir = tempfile.mkdtemp(prefix='stories-parts-')
+            try:
+                return range(stream.write_parts(report, path, out_dir, pages)['rows'])
+            finally:
+                shutil.rmtree(out_dir)
+    base = rss_mb()
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        df = parse(path)
+        times.append(time.perf_counter() - t0)
+    print(json.dumps({'rows': len(df), 'seconds': min(times), 'peak_rss_mb': rss_mb(), 'base_rss_mb': base}))
+
+
+def measure(report, path, repeats, timeout, pages=0):
+    """Parse in a child process; the result dict always has a 'status'."""
+    cmd = [sys.executable, os.path.abspath(__file__), '--child', report, path, str(repeats), str(pages)]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {'status': 'timeout', 'error': f'no result after {timeout}s'}
+    if proc.returncode != 0:
+        status = 'killed' if proc.returncode < 0 else 'error'
+        lines = (proc.stderr.strip() or f'exit code {proc.returncode}').splitlines()
+        return {'status': status, 'error': lines[-1] if lines else ''}
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['status'] = 'ok'
+    return result
+
+
+def count_lines(path):
+    with open(path, 'rb') as f:
+        return sum(1 for _ in f)
+
+
+def run(scales, axis, repeats, timeout, keep=None, seed=0, pages=0):
+    results = []
+    print("=" * 96)
+    print(f"PARSER BENCHMARK: scale on {axis}, best of {repeats}" + (f", streamed {pages} pages a chunk" if pages else ''))
+    print("=" * 96)
+    print(f"  {'scale':>6s} {'report':9s} {'MB':>8s} {'lines':>10s} {'rows':>10s} {'seconds':>9s}"
+          f" {'rows/s':>11s} {'MB/s':>7s} {'peak RSS':>9s} {'parse RSS':>10s}")
+    for scale in scales:
+        out_dir = os.path.join(keep, f'{axis}-{scale:g}x') if keep else tempfile.mkdtemp(prefix='stories-bench-')
+        t0 = time.perf_counter()
+        paths = synth_exports.write_reports(out_dir, seed=seed, **{axis: scale})
+        t_gen = time.perf_counter() - t0
+        for report, path in paths.items():
+            size = os.path.getsize(path)
+            entry = {
+                'scale': scale, 'axis': axis, 'report': report, 'loader': LOADERS[report],
+                'file_bytes': size, 'file_lines': count_lines(path), 'generate_seconds': t_gen,
+                'stream_pages': pages,
+            }
+            entry.update(measure(report, path, repeats, timeout, pages))
+            if entry['status'] == 'ok':
+                entry['rows_per_sec'] = entry['rows'] / entry['seconds'] if entry['seconds'] else None
+                entry['mb_per_sec'] = size / 1e6 / entry['seconds'] if entry['seconds'] else None
+                print(f"  {scale:>5g}x {report:9s} {size/1e6:>8.2f} {entry['file_lines']:>10,} {entry['rows']:>10,}"
+                      f" {entry['seconds']:>9.3f} {entry['rows_per_sec']:>11,.0f} {entry['mb_per_sec']:>7.1f}"
+                      f" {entry['peak_rss_mb']:>7.0f}MB {entry['peak_rss_mb'] - entry['base_rss_mb']:>8.0f}MB")
+            else:
+                print(f"  {scale:>5g}x {report:9s} {size/1e6:>8.2f} {entry['file_lines']:>10,}  "
+                      f"{entry['status'].upper()}: {entry['error']}")
+            results.append(entry)
+        if not keep:
+            for path in paths.values():
+                os.remove(path)
+            os.rmdir(out_dir)
+    return results
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        return child(sys.argv[2], sys.argv[3], int(sys.argv[4]), int(sys.argv[5]))
+
+    ap = argparse.ArgumentParser(description='Time the four report parsers on synthetic exports.')
+    ap.add_argument('--scales', type=float, nargs='+', default=[1, 10, 100], help='factors of the real exports')
+    ap.add_argument('--axis', choices=['branches', 'products', 'months'], default='branches', help='what the factor grows')
+    ap.add_argument('--repeats', type=int, default=3, help='parses per loader; the fastest counts')
+    ap.add_argument('--timeout', type=float, default=600, help='seconds before a loader is recorded as timed out')
+    ap.add_argument('--output', default='bench_parsers.json', help='JSON results file')
+    ap.add_argument('--keep', metavar='DIR', help='keep the generated exports under DIR')
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--stream', type=int, nargs='?', const=256, default=0, metavar='PAGES',
+                    help='read the hierarchical reports page-chunked into part files (default 256 pages a chunk)')
+    args = ap.parse_args()
+
+    import numpy
+    import pandas
+    started = datetime.datetime.now().isoformat(timespec='seconds')
+    results = run(args.scales, args.axis, args.repeats, args.timeout, args.keep, args.seed, args.stream)
+    report = {
+        'benchmark': 'parsers',
+        'started': started,
+        'python': platform.python_version(),
+        'pandas': pandas.__version__,
+        'numpy': numpy.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'axis': args.axis,
+        'scales': args.scales,
+        'repeats': args.repeats,
+        'stream_pages': args.stream,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    return 1 if any(r['status'] != 'ok' for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Benchmark: branch -> section -> product drill-down, raw-row groupby vs the materialized rollup
+Run: python benchmarks/bench_rollup.py [data_dir] [copies]
+
+`copies` stacks the item report that many times under renamed branches to
+stand in for several years of exports.
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stories_io import rollup
+from stories_io.analytics import PRODUCT_SUMS
+from stories_io.dtypes import compact, PRODUCT_CATEGORICALS, PRODUCT_FLOAT32
+from stories_io.parsers import report_paths, parse_product_profit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPEATS = 20
+
+
+def stacked(df, copies):
+    parts = [df.assign(Branch=df['Branch'].astype(str) + f' #{i}') for i in range(copies)]
+    return compact(pd.concat(parts, ignore_index=True), PRODUCT_CATEGORICALS, PRODUCT_FLOAT32)
+
+
+def raw_drill(df, path, level):
+    rows = df
+    for key, value in path.items():
+        rows = rows[rows[key] == value]
+    return rows[PRODUCT_SUMS].astype('float64').groupby(rows[level], observed=True).sum()
+
+
+def best_of(fn, *args):
+    times = []
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main():
+    paths = report_paths(sys.argv[1] if len(sys.argv) > 1 else ROOT)
+    copies = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    df = stacked(parse_product_profit(paths['products']), copies)
+
+    t0 = time.perf_counter()
+    cube = rollup.build_rollup(df)
+    t_build = time.perf_counter() - t0
+
+    branch = df['Branch'].iloc[0]
+    section = df['Section'].iloc[0]
+    drills = [
+        ('by branch', {}, 'Branch'),
+        ('branch -> section', {'Branch': branch}, 'Section'),
+        ('section -> product', {'Branch': branch, 'Section': section}, 'Product'),
+        ('product across chain', {}, 'Product'),
+    ]
+
+    print("=" * 60)
+    print(f"ROLLUP BENCHMARK: {len(df):,} item rows -> {len(cube):,} rollup rows")
+    print("=" * 60)
+    print(f"  {'rollup build':24s}: {t_build*1000:>8.2f} ms (once per export)")
+    grand = rollup.query(cube)[PRODUCT_SUMS].iloc[0]
+    raw = df[PRODUCT_SUMS].astype('float64').sum()
+    print(f"  {'grand total matches rows':24s}: {((grand - raw).abs() <= 1e-6 + 1e-9 * raw.abs()).all()}")
+    for name, path, level in drills:
+        t_raw = best_of(raw_drill, df, path, level)
+        t_cube = best_of(rollup.query, cube, [level], path)
+        print(f"  {name:24s}: {t_raw*1000:>8.2f} ms -> {t_cube*1000:>6.2f} ms  ({t_raw/t_cube:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
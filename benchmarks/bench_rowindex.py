@@ -0,0 +1,82 @@
+"""
+Benchmark: scoping the item report to branches / a service, boolean scan vs row-position index
+Run: python benchmarks/bench_rowindex.py [data_dir] [copies]
+
+`copies` stacks the item report that many times under renamed branches to
+stand in for a larger chain.
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stories_io import rowindex
+from stories_io.analytics import product_totals
+from stories_io.dtypes import compact, PRODUCT_CATEGORICALS, PRODUCT_FLOAT32
+from stories_io.parsers import report_paths, parse_product_profit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPEATS = 20
+
+
+def stacked(df, copies):
+    parts = [df.assign(Branch=df['Branch'].astype(str) + f' #{i}') for i in range(copies)]
+    return compact(pd.concat(parts, ignore_index=True), PRODUCT_CATEGORICALS, PRODUCT_FLOAT32)
+
+
+def scan_rows(df, branches, service):
+    return df[df['Branch'].isin(branches) & (df['Service'] == service)]
+
+
+def indexed_rows(df, index, branches, service):
+    return rowindex.take(df, index, Branch=branches, Service=service)
+
+
+def scan(df, branches, service):
+    return product_totals(scan_rows(df, branches, service))
+
+
+def indexed(df, index, branches, service):
+    return product_totals(indexed_rows(df, index, branches, service))
+
+
+def best_of(fn, *args):
+    times = []
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main():
+    paths = report_paths(sys.argv[1] if len(sys.argv) > 1 else ROOT)
+    copies = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    df = stacked(parse_product_profit(paths['products']), copies)
+
+    t0 = time.perf_counter()
+    index = rowindex.build_row_index(df, ['Branch', 'Service'])
+    t_build = time.perf_counter() - t0
+
+    branches = rowindex.key_values(index, 'Branch')
+    service = rowindex.key_values(index, 'Service')[0]
+
+    print("=" * 60)
+    print(f"ROW INDEX BENCHMARK: {len(df):,} item rows, {len(index.positions)} branch/service keys")
+    print("=" * 60)
+    print(f"  {'index build':24s}: {t_build*1000:>8.2f} ms (once per export)")
+    for label, scan_fn, index_fn in (('filter', scan_rows, indexed_rows), ('filter + product totals', scan, indexed)):
+        print(f"\n{label}")
+        for n in (1, 3, 10):
+            scope = branches[:n]
+            t_scan = best_of(scan_fn, df, scope, service)
+            t_index = best_of(index_fn, df, index, scope, service)
+            print(f"  {f'{n} branch(es) + service':24s}: {t_scan*1000:>8.2f} ms -> {t_index*1000:>6.2f} ms"
+                  f"  ({t_scan/t_index:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
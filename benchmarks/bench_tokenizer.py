@@ -0,0 +1,62 @@
+"""
+Benchmark: lookahead-regex line split vs the csv-based tokenizer
+Run: python benchmarks/bench_tokenizer.py [path/to/export.csv]
+"""
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stories_io.tokenizer import tokenize_lines
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PATH = os.path.join(ROOT, 'rep_s_00014_SMRY.csv')
+REPEATS = 5
+
+SPLIT_RE = re.compile(r',(?=(?:[^"]*"[^"]*")*[^"]*$)')
+
+
+def regex_tokenize(lines):
+    """The split every loader used before the shared tokenizer."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        yield line, [p.strip().strip('"') for p in SPLIT_RE.split(line)]
+
+
+def best_of(fn, lines):
+    times = []
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        rows = list(fn(lines))
+        times.append(time.perf_counter() - t0)
+    return min(times), rows
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        lines = f.readlines()
+    size_mb = os.path.getsize(path) / 1e6
+
+    print("=" * 60)
+    print(f"TOKENIZER BENCHMARK: {os.path.basename(path)} ({size_mb:.2f} MB, {len(lines):,} lines)")
+    print("=" * 60)
+
+    t_regex, rows_regex = best_of(regex_tokenize, lines)
+    t_csv, rows_csv = best_of(tokenize_lines, lines)
+
+    mismatches = sum(1 for a, b in zip(rows_regex, rows_csv) if a != b)
+    mismatches += abs(len(rows_regex) - len(rows_csv))
+
+    print(f"  {'regex split':20s}: {t_regex*1000:>8.1f} ms  ({len(lines)/t_regex:>12,.0f} lines/s)")
+    print(f"  {'csv tokenizer':20s}: {t_csv*1000:>8.1f} ms  ({len(lines)/t_csv:>12,.0f} lines/s)")
+    print(f"  {'speedup':20s}: {t_regex/t_csv:>8.1f}x")
+    print(f"  {'mismatched rows':20s}: {mismatches:>8d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Compare two timings.json reports (e.g. last night's and tonight's) stage by stage
+Run: python benchmarks/compare_timings.py OLD.json NEW.json [--metric wall_s|cpu_s|peak_mb] [--threshold 0.2]
+
+Stages are matched by name (repeated names are summed). A stage regresses
+when `metric` grows by more than `threshold` (relative) and by more than
+`--min` in absolute terms, which keeps millisecond stages from flapping.
+Exits 1 when any stage regressed, so a nightly job can fail on it.
+"""
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+
+
+def stage_totals(report, metric):
+    totals = defaultdict(float)
+    for st in report['stages']:
+        if st.get(metric) is not None:
+            totals[st['name']] += st[metric]
+    return totals
+
+
+def compare(old, new, metric='wall_s', threshold=0.2, min_delta=0.05):
+    """[(stage, old value, new value, regressed)] for every stage in either report, in `new` order."""
+    before, after = stage_totals(old, metric), stage_totals(new, metric)
+    rows = []
+    for name in list(after) + [n for n in before if n not in after]:
+        a, b = before.get(name), after.get(name)
+        regressed = a is not None and b is not None and b - a > min_delta and b > a * (1 + threshold)
+        rows.append((name, a, b, regressed))
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Flag stages that got slower (or hungrier) between two timings.json reports.')
+    ap.add_argument('old')
+    ap.add_argument('new')
+    ap.add_argument('--metric', choices=['wall_s', 'cpu_s', 'peak_mb'], default='wall_s')
+    ap.add_argument('--threshold', type=float, default=0.2, help='relative growth that counts as a regression')
+    ap.add_argument('--min', dest='min_delta', type=float, default=0.05, help='absolute growth below which nothing is flagged')
+    args = ap.parse_args()
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    rows = compare(old, new, args.metric, args.threshold, args.min_delta)
+    print(f"{'stage':36s} {'old':>10s} {'new':>10s} {'change':>8s}   ({args.metric}; {old['started']} -> {new['started']})")
+    for name, a, b, regressed in rows:
+        fmt = lambda v: f'{v:10.3f}' if v is not None else f"{'-':>10s}"
+        change = f'{(b - a) / a * 100:+7.1f}%' if a and b is not None else f"{'':>8s}"
+        print(f"{name:36s} {fmt(a)} {fmt(b)} {change}{'   REGRESSED' if regressed else ''}")
+
+    regressions = [name for name, *_, regressed in rows if regressed]
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) regressed: {', '.join(regressions)}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
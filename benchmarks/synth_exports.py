@@ -0,0 +1,309 @@
+"""
+Synthetic POS exports in the layouts of the four real reports, at any size
+Run: python benchmarks/synth_exports.py OUT_DIR [--branches X] [--products X] [--months X] [--seed N]
+
+The factors scale the real exports (25 branches, ~550 items per branch, 13
+months): `--branches 10` writes 250 branches, `--products 10` a ten times
+larger menu, `--months 10` 130 months of REP_S_00134. The files keep what the
+parsers have to cope with: repeated page headers (and the monthly report's
+repeated month header with the year restated), branch / service / category /
+section / division / group rows with their subtotals, quoted thousands
+separators, "Stories - x" / "Stories x" branch name variants, the truncated
+Total Price column and the copyright footers. Values are random but
+consistent across reports (the category and group reports total the items).
+"""
+
+import argparse
+import csv
+import math
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stories_io.parsers import MONTHS, REPORT_FILES
+
+BASE_BRANCHES = 25
+BASE_PRODUCTS = 550
+BASE_MONTHS = 13
+FIRST_YEAR = 2025
+PAGE_ROWS = 34           # body rows per page of the item / group / category reports
+MONTHLY_PAGE_ROWS = 14   # branch rows per page of REP_S_00134
+COPYRIGHT = 'Copyright © 2026 Omega Software, Inc. All Rights Reserved.'
+
+SERVICES = ['TAKE AWAY', 'TABLE']
+MENU = {
+    'BEVERAGES': {
+        'HOT BAR SECTION': ['BLACK COFFEE', 'MIXED HOT BEVERAGE', 'TEA'],
+        'COLD BAR SECTION': ['MIXED COLD BEVERAGES', 'BLENDED DRINKS', 'ICE TEA'],
+        'GRAB AND GO': ['WATER AND SOFT DRINKS'],
+    },
+    'FOOD': {
+        'FOOD SECTION': ['SANDWICHES', 'SALADS', 'PASTRY', 'FROZEN YOGHURT'],
+        'DONUTS': ['DONUTS'],
+    },
+}
+SIZES = ['SMALL', 'MEDIUM', 'LARGE']
+SEASON = np.array([7.3, 6.2, 7.0, 8.8, 4.8, 2.0, 9.7, 11.9, 10.0, 11.2, 10.5, 10.5])
+SEASON = SEASON / SEASON.sum()
+
+
+def money(v):
+    return f'{v:,.2f}'
+
+
+def qty_text(v):
+    # The export drops a decimal once the integer part reaches six digits
+    return f'{v:,.1f}' if abs(v) >= 1e5 else f'{v:,.2f}'
+
+
+def pct(v):
+    return f'{v:.2f}'
+
+
+def truncated(v):
+    # Total Price is cut to the column width in the export (the parsers use Cost + Profit)
+    while abs(v) >= 1e7:
+        v /= 10
+    return v
+
+
+def branch_labels(n):
+    """Raw export branch names, mixing the "Stories - x" / "Stories x" / lower-case variants."""
+    forms = ['Stories - Branch {:04d}', 'Stories Branch {:04d}', 'Stories branch {:04d}']
+    return [forms[i % 3].format(i + 1) for i in range(n)]
+
+
+def catalogue(n_products, rng):
+    """Menu items as parallel arrays, in category / section / group order."""
+    groups = [(cat, sec, grp) for cat, secs in MENU.items() for sec, grps in secs.items() for grp in grps]
+    per_group = np.diff(np.linspace(0, n_products, len(groups) + 1).round().astype(int))
+    items = {'category': [], 'section': [], 'group': [], 'name': []}
+    for (cat, sec, grp), k in zip(groups, per_group):
+        for j in range(k):
+            # Every 8th item is an add-on, sold at 0 with a cost like the combo toppings
+            stem = f'ADD {grp}' if j % 8 == 7 else grp
+            items['category'].append(cat)
+            items['section'].append(sec)
+            items['group'].append(grp)
+            items['name'].append(f'{stem} {j // len(SIZES) + 1:03d} {SIZES[j % len(SIZES)]}')
+    items = {k: np.array(v) for k, v in items.items()}
+    n = len(items['name'])
+    addon = np.char.startswith(items['name'], 'ADD ')
+    items['price'] = np.where(addon, 0.0, rng.uniform(80, 900, n).round(2))
+    items['unit_cost'] = np.where(addon, rng.uniform(5, 40, n), items['price'] * rng.uniform(0.15, 0.45, n)).round(2)
+    items['popularity'] = rng.gamma(1.2, 1.0, n)
+    return items
+
+
+def branch_sales(items, rng):
+    """(services, items) quantities, revenue and cost of one branch; qty 0 = not sold."""
+    n = len(items['name'])
+    sold = rng.random((len(SERVICES), n)) < 0.5
+    qty = np.where(sold, np.ceil(rng.poisson(items['popularity'] * 100, (len(SERVICES), n))), 0.0)
+    revenue = qty * items['price']
+    cost = qty * items['unit_cost']
+    return qty, revenue, cost
+
+
+class PagedWriter:
+    """csv writer that repeats the page header every `page_rows` body rows.
+
+    The body goes to a scratch file first so the final file's page headers
+    can carry the real page count ("Page n of, N"), as the exports do.
+    """
+
+    def __init__(self, path, title_rows, page_header, column_header, footer_rows, page_rows=PAGE_ROWS):
+        self.path, self.title_rows, self.page_header = path, title_rows, page_header
+        self.column_header, self.footer_rows, self.page_rows = column_header, footer_rows, page_rows
+        self.rows = 0
+        self._body = open(path + '.body', 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._body, lineterminator='\n')
+
+    def row(self, fields):
+        self._writer.writerow(fields)
+        self.rows += 1
+
+    def close(self):
+        self._body.close()
+        pages = max(1, math.ceil(self.rows / self.page_rows))
+        with open(self.path, 'w', newline='', encoding='utf-8-sig') as out, open(self.path + '.body', encoding='utf-8') as body:
+            writer = csv.writer(out, lineterminator='\n')
+            writer.writerows(self.title_rows)
+            for i, line in enumerate(body):
+                if i % self.page_rows == 0:
+                    writer.writerow(self.page_header(i // self.page_rows + 1, pages))
+                    writer.writerow(self.column_header)
+                out.write(line)
+            for i, fields in enumerate(self.footer_rows):
+                out.write(('\n' if i else '') + ','.join(f'"{f}"' if ',' in f else f for f in fields))
+        os.remove(self.path + '.body')
+        return self.path
+
+
+def _profit_row(name, qty, revenue, cost):
+    profit = revenue - cost
+    cost_pct = cost / revenue * 100 if revenue else 0.0
+    profit_pct = profit / revenue * 100 if revenue else 100.0
+    return [name, qty_text(qty), money(truncated(revenue)), '', money(cost), pct(cost_pct), money(profit), '', pct(profit_pct), '']
+
+
+def _profit_writer(path, title, first_column, report_id):
+    blank = [''] * 9
+    return PagedWriter(
+        path,
+        title_rows=[['Stories'] + blank, [title] + blank],
+        page_header=lambda page, pages: ['22-Jan-26', '', '', 'Years:2025 Month:0', '', '', '', f'Page {page} of', '', f' {pages}'],
+        column_header=[first_column, 'Qty', 'Total Price', '', 'Total Cost', 'Total Cost %', 'Total Profit', '', 'Total Profit %', ''],
+        footer_rows=[[report_id, COPYRIGHT, '', '', '', '', '', '', 'www.omegapos.com', '']],
+    )
+
+
+def write_reports(out_dir, branches=1.0, products=1.0, months=1.0, seed=0):
+    """Write the four exports into `out_dir`; returns {report key: path}."""
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {key: os.path.join(out_dir, fname) for key, fname in REPORT_FILES.items()}
+    labels = branch_labels(max(1, round(BASE_BRANCHES * branches)))
+    items = catalogue(max(len(SIZES), round(BASE_PRODUCTS * products)), rng)
+
+    by_category = {cat: items['category'] == cat for cat in MENU}
+    sections = list(dict.fromkeys(zip(items['category'], items['section'])))
+    groups = list(dict.fromkeys(zip(items['section'], items['group'])))
+
+    item_report = _profit_writer(paths['products'], 'Theoretical Profit By Item', 'Product Desc', 'REP_S_00014')
+    category_report = _profit_writer(paths['category'], 'Theoretical Profit By Category', 'Category', 'REP_S_00673')
+    blank = [''] * 4
+    group_report = PagedWriter(
+        paths['groups'],
+        title_rows=[['Stories'] + blank, ['Sales by Items By Group'] + blank],
+        page_header=lambda page, pages: ['19-Jan-26', 'Years:2025 Months:0', '', f'Page {page} of', f' {pages}'],
+        column_header=['Description', 'Barcode', 'Qty', 'Total Amount', ''],
+        footer_rows=[['REP_S_00191', COPYRIGHT[:-len('Reserved.')], '', '', ''], ['', '', '', 'www.omegapos.com', '']],
+    )
+
+    annual = []
+    for label in labels:
+        qty, revenue, cost = branch_sales(items, rng)
+        annual.append(revenue.sum())
+
+        # rep_s_00014: Branch > Service > Category > Section > item
+        item_report.row([label] + [''] * 9)
+        for s, service in enumerate(SERVICES):
+            item_report.row([service] + [''] * 9)
+            for cat in MENU:
+                item_report.row([cat] + [''] * 9)
+                for sec_cat, section in sections:
+                    if sec_cat != cat:
+                        continue
+                    item_report.row([section] + [''] * 9)
+                    in_section = np.flatnonzero((items['section'] == section) & (qty[s] > 0))
+                    for i in in_section:
+                        item_report.row(_profit_row(items['name'][i], qty[s, i], revenue[s, i], cost[s, i]))
+                    item_report.row(_profit_row('Total By Division:', qty[s, in_section].sum(),
+                                                revenue[s, in_section].sum(), cost[s, in_section].sum()))
+                m = by_category[cat]
+                item_report.row(_profit_row('Total By Category:', qty[s, m].sum(), revenue[s, m].sum(), cost[s, m].sum()))
+            item_report.row(_profit_row('Total By Department:', qty[s].sum(), revenue[s].sum(), cost[s].sum()))
+        item_report.row(_profit_row('Total By Branch:', qty.sum(), revenue.sum(), cost.sum()))
+
+        # rep_s_00673: one row per category and the branch total
+        category_report.row([label] + [''] * 9)
+        for cat, m in by_category.items():
+            category_report.row(_profit_row(cat, qty[:, m].sum(), revenue[:, m].sum(), cost[:, m].sum()))
+        category_report.row(_profit_row('Total By Branch:', qty.sum(), revenue.sum(), cost.sum()))
+
+        # rep_s_00191: Branch > Division > Group > item, services summed
+        item_qty, item_amount = qty.sum(axis=0), revenue.sum(axis=0)
+        group_report.row([f'Branch: {label}', '', '', '', ''])
+        for division in dict.fromkeys(items['section']):
+            in_division = (items['section'] == division) & (item_qty > 0)
+            group_report.row([f'Division: {division}', '', '', '', ''])
+            for section, group in groups:
+                if section != division:
+                    continue
+                group_report.row([f'Group: {group}', '', '', '', ''])
+                in_group = np.flatnonzero((items['group'] == group) & in_division)
+                for i in in_group:
+                    group_report.row([items['name'][i], '', repr(float(item_qty[i])), money(item_amount[i]), ''])
+                group_report.row([f'Total by Group: {group}', '', repr(float(item_qty[in_group].sum())),
+                                  money(item_amount[in_group].sum()), ''])
+            group_report.row([f'Total by Division: {division}', '', repr(float(item_qty[in_division].sum())),
+                              money(item_amount[in_division].sum()), ''])
+        group_report.row([f'Total by Branch: {label}', '', money(item_qty.sum()), money(item_amount.sum()), ''])
+
+    for report in (item_report, category_report, group_report):
+        report.close()
+    write_monthly(paths['monthly'], labels, np.array(annual), max(1, round(BASE_MONTHS * months)), rng)
+    return paths
+
+
+def monthly_values(annual, n_months, rng):
+    """(years, branches, 12) revenue: seasonality, staggered openings, months after the export date 0."""
+    n_years = math.ceil(n_months / 12)
+    n = len(annual)
+    opened = np.where(rng.random(n) < 0.3, rng.integers(1, max(2, n_months - 1), n), 0)
+    growth = rng.normal(1.02, 0.05, (n_years, n)).cumprod(axis=0)
+    values = (annual[None, :, None] * SEASON[None, None, :] * growth[:, :, None]
+              * rng.normal(1.0, 0.08, (n_years, n, 12)))
+    month_no = np.arange(n_years * 12).reshape(n_years, 1, 12)
+    values = np.where((month_no >= opened[None, :, None]) & (month_no < n_months), values, 0.0)
+    return values.round(2)
+
+
+def write_monthly(path, labels, annual, n_months, rng):
+    """REP_S_00134: a Jan-Sep block, then an Oct-Dec + Total By Year block, each year by year."""
+    values = monthly_values(annual, n_months, rng)
+    years = [FIRST_YEAR + y for y in range(len(values))]
+    pad = [''] * 11
+    rows = [
+        ['Stories'] + [''] * 13,
+        ['Comparative Monthly Sales '] + [''] * 13,
+        ['22-Jan-2026', '', 'Year: ' + ','.join(str(y) for y in reversed(years))] + [''] * 9 + ['Page 1 of', '0.01'],
+    ]
+
+    def block(months, header_first, header, first_page_pad, with_total):
+        # The first page carries an extra leading column and trailing padding
+        rows.append(header_first)
+        on_page, first_page = 0, True
+        for y, year in enumerate(years):
+            present = [b for b in range(len(labels)) if values[y, b].any()]
+            for k, b in enumerate(present):
+                if on_page == MONTHLY_PAGE_ROWS:
+                    rows.append(header)
+                    on_page, first_page = 0, False
+                vals = [money(v) for v in values[y, b, months]]
+                if with_total:
+                    vals.append(money(values[y, b].sum()))
+                restate = k == 0 or on_page == 0
+                lead, trail = first_page_pad if first_page else ([], [])
+                rows.append([str(year) if restate else '', labels[b]] + lead + vals + trail)
+                on_page += 1
+            totals = values[y][:, months].sum(axis=0).tolist() + ([values[y].sum()] if with_total else [])
+            rows.append(['', 'Total'] + [money(v) for v in totals])
+
+    block(list(range(9)), ['', '', ''] + MONTHS[:9] + ['', ''], ['', ''] + MONTHS[:9], ([''], ['', '']), False)
+    block(list(range(9, 12)), ['', ''] + MONTHS[9:] + ['Total By Year'] + pad[:5],
+          ['', ''] + MONTHS[9:] + ['Total By Year'], ([], [''] * 5), True)
+
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        text = '\n'.join(','.join(f'"{c}"' if ',' in c else c for c in row) for row in rows)
+        f.write(text)
+    return path
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Write synthetic POS exports in the layouts of the real ones.')
+    ap.add_argument('out_dir')
+    ap.add_argument('--branches', type=float, default=1.0, help=f'branch factor (1 = {BASE_BRANCHES} branches)')
+    ap.add_argument('--products', type=float, default=1.0, help=f'menu size factor (1 = {BASE_PRODUCTS} items)')
+    ap.add_argument('--months', type=float, default=1.0, help=f'monthly report length factor (1 = {BASE_MONTHS} months)')
+    ap.add_argument('--seed', type=int, default=0)
+    args = ap.parse_args()
+    for key, path in write_reports(args.out_dir, args.branches, args.products, args.months, args.seed).items():
+        print(f"  {key:10s} {path}  {os.path.getsize(path) / 1e6:8.2f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+"""
+Per-branch executive summaries: one tailored PDF per branch, built in parallel.
+
+    python branch_summary.py --data-dir DATA --out-dir OUT [--branch NAME ...] [--workers N] [--vector]
+
+The exports are parsed and analysed once. `branch_packs` cuts the analysis
+into one small pack per branch (its seasonality against the chain, margin
+rank, beverage/food mix, top products and YoY), and `build_branch_summaries`
+hands the packs to a process pool, so the workers only receive their few KB
+of figures and spend their time on the chart and the PDF. Progress is printed
+as the PDFs complete, followed by a timing report.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.lib.colors import HexColor, white
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, HRFlowable
+
+from charts import chart_branch_seasonality, chart_workers, setup_style
+from exec_summary import OUT_DIR, ACCENT, LIGHT_GRAY, styles, chart_flowable, HAVE_SVGLIB
+from stories_io import cube, rollup
+from stories_io.parsers import MONTHS
+
+TOP_PRODUCTS = 10
+
+
+def branch_slug(branch):
+    return re.sub(r'[^A-Za-z0-9]+', '_', branch).strip('_')
+
+
+def branch_pdf_name(branch):
+    return f'Branch_Summary_{branch_slug(branch)}.pdf'
+
+
+# ============================================================
+# PACKS (parent process)
+# ============================================================
+def season_year(revenue_cube):
+    """Latest year with chain-wide sales in all 12 months, else the latest year."""
+    chain = revenue_cube.values.sum(axis=1)
+    full = [y for y, i in revenue_cube.year_index.items() if (chain[i] > 0).all()]
+    return max(full) if full else revenue_cube.years[-1]
+
+
+def branch_packs(result, branches=None):
+    """{branch: pack} of the figures each branch PDF needs, from an analysis.analyze() result."""
+    revenue_cube = result['revenue_cube']
+    year = season_year(revenue_cube)
+    months = cube.year_values(revenue_cube, year)
+    active = (months > 0).sum(axis=0)
+    chain_avg = np.divide(months.sum(axis=0), active, out=np.zeros(len(MONTHS)), where=active > 0)
+
+    df_category = result['df_category']
+    totals = df_category[df_category['Category'] == 'TOTAL'].drop_duplicates('Branch').set_index('Branch')
+    margin_rank = totals['Profit %'].rank(ascending=False, method='min')
+    revenue_rank = totals['Revenue'].rank(ascending=False, method='min')
+    mix = df_category[df_category['Category'].isin(['BEVERAGES', 'FOOD'])].pivot_table(
+        index='Branch', columns='Category', values=['Revenue', 'Total Profit'], aggfunc='sum').fillna(0)
+    chain_mix = mix.sum()
+
+    yoy_pair = tuple(revenue_cube.years[-2:])
+    yoy = result['yoy_tables']['month']
+    yoy = yoy[(yoy['Prev Year'] == yoy_pair[0]) & (yoy['Year'] == yoy_pair[-1])]
+
+    def bev_share(rev):
+        return float(rev['BEVERAGES'] / (rev['BEVERAGES'] + rev['FOOD']) * 100) if rev.sum() else float('nan')
+
+    packs = {}
+    for branch in branches or revenue_cube.branches:
+        b = revenue_cube.branch_index.get(branch)
+        if b is None or branch not in totals.index:
+            continue
+        products = rollup.drill_down(result['product_rollup'], {'Branch': branch}, 'Product')
+        products = products[~products['Product'].str.startswith('ADD ')].head(TOP_PRODUCTS)
+        branch_mix = mix.loc[branch] if branch in mix.index else None
+        packs[branch] = {
+            'branch': branch,
+            'year': year,
+            'months': months[b].tolist(),
+            'chain_avg': chain_avg.tolist(),
+            'n_branches': len(totals),
+            'revenue': float(totals.at[branch, 'Revenue']),
+            'profit': float(totals.at[branch, 'Total Profit']),
+            'margin': float(totals.at[branch, 'Profit %']),
+            'chain_margin': float(totals['Profit %'].mean()),
+            'margin_rank': int(margin_rank[branch]),
+            'revenue_rank': int(revenue_rank[branch]),
+            'bev_share': bev_share(branch_mix['Revenue']) if branch_mix is not None else float('nan'),
+            'chain_bev_share': bev_share(chain_mix['Revenue']),
+            'bev_margin': _margin(branch_mix, 'BEVERAGES'),
+            'food_margin': _margin(branch_mix, 'FOOD'),
+            'top_products': products[['Product', 'Qty', 'Revenue', 'Total Profit', 'Profit Margin']].to_dict('records'),
+            'yoy_pair': yoy_pair,
+            'yoy': yoy.loc[yoy['Branch'] == branch, ['Month', 'Prev', 'Curr', 'YoY Change %']].to_dict('records'),
+        }
+    return packs
+
+
+def _margin(branch_mix, category):
+    if branch_mix is None or not branch_mix['Revenue'][category]:
+        return float('nan')
+    return float(branch_mix['Total Profit'][category] / branch_mix['Revenue'][category] * 100)
+
+
+# ============================================================
+# ONE PDF (worker process)
+# ============================================================
+def _table(rows, col_widths, numeric_from=1):
+    t = Table(rows, colWidths=col_widths)
+    t.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), ACCENT),
+        ('TEXTCOLOR', (0, 0), (-1, 0), white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8.5),
+        ('ALIGN', (numeric_from, 0), (-1, -1), 'RIGHT'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('GRID', (0, 0), (-1, -1), 0.5, LIGHT_GRAY),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#F9FAFB')]),
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+    ]))
+    return t
+
+
+def build_branch_summary(pack, out_dir, vector=False):
+    """Write one branch's summary PDF into `out_dir` and return its path."""
+    branch, n = pack['branch'], pack['n_branches']
+    pdf_path = os.path.join(out_dir, branch_pdf_name(branch))
+    doc = SimpleDocTemplate(pdf_path, pagesize=letter, topMargin=0.6*inch, bottomMargin=0.6*inch,
+                            leftMargin=0.75*inch, rightMargin=0.75*inch)
+    story = []
+
+    story.append(Paragraph(f"Stories Coffee: {branch}", styles['MainTitle']))
+    story.append(Paragraph(f"Branch Summary  |  {pack['year']} performance", styles['Subtitle']))
+    story.append(HRFlowable(width="100%", thickness=2, color=ACCENT, spaceAfter=12))
+
+    # 1. At a glance
+    story.append(Paragraph("1. At a Glance", styles['SectionHead']))
+    story.append(Paragraph(
+        f"{branch} generated <b>{pack['revenue']/1e6:,.1f}M</b> in revenue and <b>{pack['profit']/1e6:,.1f}M</b> "
+        f"in gross profit, <b>#{pack['revenue_rank']}</b> of {n} branches by revenue. Its <b>{pack['margin']:.1f}% margin</b> "
+        f"ranks <b>#{pack['margin_rank']}</b> of {n} (chain average {pack['chain_margin']:.1f}%).",
+        styles['Body']
+    ))
+
+    # 2. Seasonality
+    months = pack['months']
+    active = [(v, m) for v, m in zip(months, MONTHS) if v > 0]
+    story.append(Paragraph("2. Seasonality", styles['SectionHead']))
+    if active:
+        (peak, peak_month), (trough, trough_month) = max(active), min(active)
+        story.append(Paragraph(
+            f"{peak_month} was the strongest month ({peak/1e6:,.1f}M) and {trough_month} the weakest "
+            f"({trough/1e6:,.1f}M), a <b>{peak/trough:.1f}x</b> peak-to-trough gap"
+            + (f"; sales started in {active[0][1]}." if months[0] <= 0 else "."),
+            styles['Body']
+        ))
+    img = chart_flowable(chart_branch_seasonality, pack, 6.5*inch, 2.6*inch, vector)
+    if img:
+        story.append(img)
+        story.append(Spacer(1, 6))
+
+    # 3. Beverage / food mix
+    story.append(Paragraph("3. Beverage vs Food Mix", styles['SectionHead']))
+    if not np.isnan(pack['bev_share']):
+        story.append(Paragraph(
+            f"Beverages are <b>{pack['bev_share']:.0f}%</b> of revenue (chain {pack['chain_bev_share']:.0f}%), "
+            f"at a {pack['bev_margin']:.1f}% margin against {pack['food_margin']:.1f}% for food.",
+            styles['Body']
+        ))
+
+    # 4. Top products
+    story.append(Paragraph(f"4. Top {TOP_PRODUCTS} Products by Gross Profit", styles['SectionHead']))
+    rows = [['Product', 'Qty', 'Revenue', 'Profit', 'Margin']]
+    rows += [[p['Product'][:40], f"{p['Qty']:,.0f}", f"{p['Revenue']:,.0f}", f"{p['Total Profit']:,.0f}",
+              f"{p['Profit Margin']:.1f}%"] for p in pack['top_products']]
+    story.append(_table(rows, [2.9*inch, 0.8*inch, 1.1*inch, 1.1*inch, 0.8*inch]))
+
+    # 5. Year over year
+    prev_year, curr_year = pack['yoy_pair'][0], pack['yoy_pair'][-1]
+    story.append(Paragraph(f"5. Year over Year: {prev_year} → {curr_year}", styles['SectionHead']))
+    if pack['yoy']:
+        rows = [['Month', str(prev_year), str(curr_year), 'Change']]
+        rows += [[r['Month'], f"{r['Prev']:,.0f}", f"{r['Curr']:,.0f}", f"{r['YoY Change %']:+.1f}%"] for r in pack['yoy']]
+        story.append(_table(rows, [1.6*inch, 1.4*inch, 1.4*inch, 1*inch]))
+    else:
+        story.append(Paragraph(f"No like-for-like months: {branch} did not trade in both years.", styles['Body']))
+
+    doc.build(story)
+    return pdf_path
+
+
+def _timed_build(pack, out_dir, vector):
+    t0, c0 = time.perf_counter(), time.process_time()
+    path = build_branch_summary(pack, out_dir, vector)
+    return path, time.perf_counter() - t0, time.process_time() - c0
+
+
+# ============================================================
+# ALL BRANCHES
+# ============================================================
+def build_branch_summaries(packs, out_dir, workers=None, executor=None, vector=False, progress=print):
+    """Build every pack's PDF, on a process pool unless `workers` is 1.
+
+    Returns {branch: (pdf path or None, wall seconds, CPU seconds, error text
+    or None)}; a failing branch does not stop the others. `progress` gets one line per
+    finished PDF (None to stay quiet).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    results = {}
+
+    def done(i, branch, path, secs, cpu, error):
+        results[branch] = (path, secs, cpu, error)
+        if progress:
+            status = f'FAILED: {error}' if error else os.path.basename(path)
+            progress(f"  [{i:>{len(str(len(packs)))}}/{len(packs)}] {branch:25s} {secs:6.2f}s  {status}")
+
+    if executor is None and (workers or chart_workers(len(packs))) <= 1:
+        setup_style()
+        for i, (branch, pack) in enumerate(packs.items(), 1):
+            t0 = time.perf_counter()
+            try:
+                done(i, branch, *_timed_build(pack, out_dir, vector), None)
+            except Exception as e:
+                done(i, branch, None, time.perf_counter() - t0, 0.0, f'{type(e).__name__}: {e}')
+        return results
+
+    with contextlib.ExitStack() as stack:
+        if executor is None:
+            executor = stack.enter_context(ProcessPoolExecutor(
+                max_workers=workers or chart_workers(len(packs)), initializer=setup_style))
+        futures = {executor.submit(_timed_build, pack, out_dir, vector): branch for branch, pack in packs.items()}
+        for i, future in enumerate(as_completed(futures), 1):
+            try:
+                done(i, futures[future], *future.result(), None)
+            except Exception as e:  # worker died or the build failed
+                done(i, futures[future], None, 0.0, 0.0, f'{type(e).__name__}: {e}')
+    return results
+
+
+def timing_report(results, wall):
+    """Summary lines: PDFs built, wall time against the CPU time of the builds, slowest branches.
+
+    The summed CPU time is what one process would have spent building the
+    PDFs one after another, so cpu / wall is the speedup from the pool.
+    """
+    ok = {b: (secs, cpu) for b, (path, secs, cpu, error) in results.items() if not error}
+    cpu = sum(c for _, c in ok.values())
+    lines = [f"{len(ok)}/{len(results)} branch PDFs in {wall:.2f}s wall, {wall / max(len(results), 1):.2f}s per branch "
+             f"({cpu:.2f}s CPU in the builds, {cpu / wall if wall else 0:.1f}x vs one at a time)"]
+    slowest = sorted(ok.items(), key=lambda kv: kv[1][0], reverse=True)[:3]
+    if slowest:
+        lines.append("slowest: " + ", ".join(f"{b} {secs:.2f}s" for b, (secs, _) in slowest))
+    failed = [b for b, (_, _, _, error) in results.items() if error]
+    if failed:
+        lines.append(f"failed: {', '.join(failed)}")
+    return lines
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Build one executive summary PDF per branch, in parallel.')
+    ap.add_argument('--data-dir', required=True, help='directory holding the four CSV exports')
+    ap.add_argument('--out-dir', default=OUT_DIR, help='directory the branch PDFs are written to (STORIES_OUT_DIR)')
+    ap.add_argument('--branch', action='append', dest='branches', metavar='NAME', help='only this branch (repeatable)')
+    ap.add_argument('--workers', type=int, default=None, help='PDF worker processes (default STORIES_CHART_WORKERS / CPU count)')
+    ap.add_argument('--vector', action='store_true', help='embed the charts as vector drawings (needs svglib)')
+    args = ap.parse_args()
+    if args.vector and not HAVE_SVGLIB:
+        ap.error('--vector needs svglib (pip install svglib)')
+
+    from analysis import analyze
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = analyze(args.data_dir)
+    packs = branch_packs(result, args.branches)
+    t_prep = time.perf_counter() - t0
+    unknown = sorted(set(args.branches or ()) - set(packs))
+    if unknown:
+        ap.error(f"unknown branch(es): {', '.join(unknown)}")
+    print(f"Analysis + {len(packs)} branch packs: {t_prep:.2f}s")
+
+    t0 = time.perf_counter()
+    results = build_branch_summaries(packs, args.out_dir, workers=args.workers, vector=args.vector)
+    for line in timing_report(results, time.perf_counter() - t0):
+        print(line)
+    return 1 if any(error for *_, error in results.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
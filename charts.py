@@ -0,0 +1,422 @@
+"""
+Stories Coffee — static report charts (01_seasonality.png … 12_yoy_heatmap.png)
+
+Every chart is a standalone function of the precomputed analysis frames in
+`data` (see analysis.py) and writes one PNG into `out_dir`. `render_all` draws
+the whole set on a process pool, since matplotlib's Agg backend is not
+thread-safe, and hands back one result per chart in CHARTS order.
+
+`render_image` draws one chart into memory instead, at an exact physical size
+and DPI (or as SVG), for embedding in the PDF reports without a PNG round-trip.
+"""
+
+import io
+import os
+import traceback
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import matplotlib.ticker as mticker
+import numpy as np
+
+from stories_io import instrument
+from stories_io.parsers import MONTHS
+
+# Color palette
+COLORS = {
+    'primary': '#2E4057',
+    'accent': '#048A81',
+    'warm': '#D4A574',
+    'highlight': '#E76F51',
+    'light': '#F4A261',
+    'bev': '#264653',
+    'food': '#E9C46A',
+}
+
+
+def setup_style():
+    warnings.filterwarnings('ignore')
+    plt.rcParams['figure.dpi'] = 150
+    plt.rcParams['savefig.dpi'] = 150
+    plt.rcParams['font.size'] = 10
+    import seaborn as sns  # only the theme and the heatmap need seaborn
+    sns.set_theme(style="whitegrid")
+
+
+class MemoryTarget:
+    """Stand-in for `out_dir` that keeps the saved chart in memory.
+
+    With `size` (width, height in inches) the figure is rescaled to that
+    aspect ratio and saved at exactly size x dpi pixels; the chart's own
+    figsize sets the design scale, so fonts and line widths keep their
+    proportions. No tight bbox is used, since it would change the pixel size.
+    """
+
+    def __init__(self, size=None, dpi=150, fmt='png'):
+        self.size, self.dpi, self.fmt = size, dpi, fmt
+        self.data = None
+
+    def save(self, fname):
+        fig = plt.gcf()
+        dpi = self.dpi
+        if self.size:
+            scale = fig.get_figwidth() / self.size[0]
+            fig.set_size_inches(self.size[0] * scale, self.size[1] * scale)
+            dpi = self.dpi / scale
+        fig.tight_layout()
+        buf = io.BytesIO()
+        fig.savefig(buf, format=self.fmt, dpi=dpi)
+        plt.close(fig)
+        self.data = buf.getvalue()
+        return fname
+
+
+def _save(out_dir, fname):
+    if isinstance(out_dir, MemoryTarget):
+        return out_dir.save(fname)
+    plt.tight_layout()
+    plt.savefig(os.path.join(out_dir, fname), bbox_inches='tight')
+    plt.close()
+    return fname
+
+
+# --- CHART 1: Monthly Seasonality ---
+def chart_seasonality(data, out_dir):
+    monthly_totals = data['monthly_totals']
+    peak_month, trough_month = data['peak_month'], data['trough_month']
+
+    fig, ax = plt.subplots(figsize=(12, 5))
+    month_vals = [monthly_totals.get(m, 0) for m in MONTHS]
+    ax.bar(range(len(MONTHS)), month_vals, color=[COLORS['accent'] if v == max(month_vals) else COLORS['highlight'] if v == min(month_vals) else COLORS['primary'] for v in month_vals], edgecolor='white', linewidth=0.5)
+    ax.set_xticks(range(len(MONTHS)))
+    ax.set_xticklabels([m[:3] for m in MONTHS], fontsize=9)
+    ax.set_title('Monthly Revenue Seasonality (2025)', fontsize=14, fontweight='bold', pad=15)
+    ax.set_ylabel('Total Revenue (Arbitrary Units)')
+    ax.yaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f'{x/1e6:.0f}M'))
+    # Annotate peak/trough
+    peak_idx = MONTHS.index(peak_month)
+    trough_idx = MONTHS.index(trough_month)
+    ax.annotate('PEAK', xy=(peak_idx, month_vals[peak_idx]), ha='center', va='bottom', fontweight='bold', color=COLORS['accent'], fontsize=9)
+    ax.annotate('TROUGH', xy=(trough_idx, month_vals[trough_idx]), ha='center', va='bottom', fontweight='bold', color=COLORS['highlight'], fontsize=9)
+    return _save(out_dir, '01_seasonality.png')
+
+
+# --- CHART 2: Branch Revenue Ranking ---
+def chart_branch_profit(data, out_dir):
+    fig, ax = plt.subplots(figsize=(12, 8))
+    df_plot = data['df_branch_totals'].sort_values('Total Profit', ascending=True)
+    colors = [COLORS['accent'] if i >= len(df_plot)-5 else COLORS['primary'] for i in range(len(df_plot))]
+    ax.barh(range(len(df_plot)), df_plot['Total Profit'], color=colors, edgecolor='white', linewidth=0.3)
+    ax.set_yticks(range(len(df_plot)))
+    ax.set_yticklabels(df_plot['Branch'], fontsize=8)
+    ax.set_title('Annual Gross Profit by Branch (2025)', fontsize=14, fontweight='bold', pad=15)
+    ax.set_xlabel('Total Gross Profit')
+    ax.xaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f'{x/1e6:.0f}M'))
+    return _save(out_dir, '02_branch_profit.png')
+
+
+# --- CHART 3: Profit Margin by Branch ---
+def chart_margin_by_branch(data, out_dir):
+    df_branch_totals = data['df_branch_totals']
+
+    fig, ax = plt.subplots(figsize=(12, 8))
+    df_plot = df_branch_totals.sort_values('Profit %', ascending=True)
+    colors = [COLORS['highlight'] if v < 70 else COLORS['accent'] if v > 73 else COLORS['primary'] for v in df_plot['Profit %']]
+    ax.barh(range(len(df_plot)), df_plot['Profit %'], color=colors, edgecolor='white', linewidth=0.3)
+    ax.set_yticks(range(len(df_plot)))
+    ax.set_yticklabels(df_plot['Branch'], fontsize=8)
+    ax.set_title('Gross Profit Margin by Branch (2025)', fontsize=14, fontweight='bold', pad=15)
+    ax.set_xlabel('Profit Margin (%)')
+    ax.axvline(x=df_branch_totals['Profit %'].mean(), color='red', linestyle='--', alpha=0.7, label=f"Avg: {df_branch_totals['Profit %'].mean():.1f}%")
+    ax.legend()
+    return _save(out_dir, '03_margin_by_branch.png')
+
+
+# --- CHART 4: Beverages vs Food ---
+def chart_bev_vs_food(data, out_dir):
+    fig, axes = plt.subplots(1, 2, figsize=(12, 5))
+
+    # Revenue split
+    labels = ['Beverages', 'Food']
+    rev_vals = [data['total_bev_rev'], data['total_food_rev']]
+    axes[0].pie(rev_vals, labels=labels, colors=[COLORS['bev'], COLORS['food']],
+                autopct='%1.1f%%', startangle=90, textprops={'fontsize': 11})
+    axes[0].set_title('Revenue Split', fontsize=13, fontweight='bold')
+
+    # Profit split
+    profit_vals = [data['total_bev_profit'], data['total_food_profit']]
+    axes[1].pie(profit_vals, labels=labels, colors=[COLORS['bev'], COLORS['food']],
+                autopct='%1.1f%%', startangle=90, textprops={'fontsize': 11})
+    axes[1].set_title('Profit Split', fontsize=13, fontweight='bold')
+
+    fig.suptitle('Beverages vs Food: Revenue & Profit Distribution', fontsize=14, fontweight='bold', y=1.02)
+    return _save(out_dir, '04_bev_vs_food.png')
+
+
+# --- CHART 5: Top Products by Profit ---
+def chart_top_products(data, out_dir):
+    fig, ax = plt.subplots(figsize=(12, 7))
+    top15 = data['df_products_only'].sort_values('Total Profit', ascending=False).head(15)
+    top15 = top15.sort_values('Total Profit', ascending=True)
+    colors = [COLORS['accent'] if 'FRAPP' in p or 'LATTE' in p else COLORS['primary'] for p in top15['Product']]
+    ax.barh(range(len(top15)), top15['Total Profit'], color=colors, edgecolor='white', linewidth=0.3)
+    ax.set_yticks(range(len(top15)))
+    ax.set_yticklabels(top15['Product'], fontsize=8)
+    ax.set_title('Top 15 Products by Gross Profit', fontsize=14, fontweight='bold', pad=15)
+    ax.set_xlabel('Total Gross Profit')
+    ax.xaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f'{x/1e6:.0f}M'))
+    return _save(out_dir, '05_top_products.png')
+
+
+# --- CHART 6: Product Groups Revenue ---
+def chart_product_groups(data, out_dir):
+    fig, ax = plt.subplots(figsize=(12, 7))
+    df_gs = data['df_group_summary'].head(15).sort_values('Total Amount', ascending=True)
+    ax.barh(range(len(df_gs)), df_gs['Total Amount'], color=COLORS['primary'], edgecolor='white', linewidth=0.3)
+    ax.set_yticks(range(len(df_gs)))
+    ax.set_yticklabels(df_gs['Group'], fontsize=8)
+    ax.set_title('Top Product Groups by Revenue', fontsize=14, fontweight='bold', pad=15)
+    ax.xaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f'{x/1e6:.0f}M'))
+    return _save(out_dir, '06_product_groups.png')
+
+
+# --- CHART 7: YoY January Comparison ---
+def chart_yoy_comparison(data, out_dir):
+    jan_compare = data['jan_compare']
+    if len(jan_compare) == 0:
+        return None
+
+    fig, ax = plt.subplots(figsize=(12, 7))
+    jan_compare_plot = jan_compare.sort_values('YoY Change %', ascending=True)
+    colors = [COLORS['accent'] if v > 0 else COLORS['highlight'] for v in jan_compare_plot['YoY Change %']]
+    ax.barh(range(len(jan_compare_plot)), jan_compare_plot['YoY Change %'], color=colors, edgecolor='white', linewidth=0.3)
+    ax.set_yticks(range(len(jan_compare_plot)))
+    ax.set_yticklabels(jan_compare_plot['Branch'], fontsize=8)
+    ax.set_title('Year-over-Year Change: January 2025 → January 2026', fontsize=14, fontweight='bold', pad=15)
+    ax.set_xlabel('Change (%)')
+    ax.axvline(x=0, color='black', linewidth=0.5)
+    return _save(out_dir, '07_yoy_comparison.png')
+
+
+# --- CHART 8: Menu Engineering Matrix (BCG-style) ---
+def chart_menu_engineering(data, out_dir):
+    df_products_only = data['df_products_only']
+
+    fig, ax = plt.subplots(figsize=(10, 8))
+    # Use products with enough volume AND valid margins
+    df_menu = df_products_only[(df_products_only['Qty'] >= 500) &
+                               (df_products_only['Revenue'] > 0) &
+                               (df_products_only['Profit Margin'].between(-200, 200))].copy()
+    median_qty = df_menu['Qty'].median()
+    median_margin = df_menu['Profit Margin'].median()
+
+    high_qty = (df_menu['Qty'] >= median_qty).to_numpy()
+    high_margin = (df_menu['Profit Margin'] >= median_margin).to_numpy()
+    colors = np.select(
+        [high_qty & high_margin, high_qty, high_margin],
+        [COLORS['accent'], COLORS['light'], COLORS['primary']],
+        default=COLORS['highlight'],
+    )
+    sizes = np.maximum(df_menu['Total Profit'].abs().to_numpy() / 5000, 10)
+    ax.scatter(df_menu['Qty'], df_menu['Profit Margin'], s=sizes,
+               c=colors, alpha=0.6, edgecolors='white', linewidth=0.5)
+
+    ax.axhline(y=median_margin, color='gray', linestyle='--', alpha=0.5)
+    ax.axvline(x=median_qty, color='gray', linestyle='--', alpha=0.5)
+
+    # Quadrant labels
+    ax.text(0.95, 0.95, '⭐ STARS\nHigh Vol + High Margin', transform=ax.transAxes, ha='right', va='top', fontsize=9, color=COLORS['accent'], fontweight='bold')
+    ax.text(0.05, 0.95, '💎 PUZZLES\nLow Vol + High Margin', transform=ax.transAxes, ha='left', va='top', fontsize=9, color=COLORS['primary'], fontweight='bold')
+    ax.text(0.95, 0.05, '🐎 WORKHORSES\nHigh Vol + Low Margin', transform=ax.transAxes, ha='right', va='bottom', fontsize=9, color=COLORS['light'], fontweight='bold')
+    ax.text(0.05, 0.05, '🐕 DOGS\nLow Vol + Low Margin', transform=ax.transAxes, ha='left', va='bottom', fontsize=9, color=COLORS['highlight'], fontweight='bold')
+
+    # Label some notable products
+    for _, row in df_menu.nlargest(8, 'Total Profit').iterrows():
+        label = row['Product'][:20]
+        ax.annotate(label, (row['Qty'], row['Profit Margin']), fontsize=6, alpha=0.8,
+                    xytext=(5, 5), textcoords='offset points')
+
+    ax.set_title('Menu Engineering Matrix\n(Bubble size = Total Profit)', fontsize=14, fontweight='bold', pad=15)
+    ax.set_xlabel('Units Sold (Volume)')
+    ax.set_ylabel('Profit Margin (%)')
+    ax.xaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f'{x/1000:.0f}K'))
+    return _save(out_dir, '08_menu_engineering.png')
+
+
+# --- CHART 9: Beverage/Food Mix by Branch ---
+def chart_bev_food_mix(data, out_dir):
+    fig, ax = plt.subplots(figsize=(12, 8))
+    df_mix = data['df_cat_pivot'].sort_values('Bev %', ascending=True)
+    ax.barh(range(len(df_mix)), df_mix['Bev %'], color=COLORS['bev'], label='Beverages', edgecolor='white', linewidth=0.3)
+    ax.barh(range(len(df_mix)), 100 - df_mix['Bev %'], left=df_mix['Bev %'], color=COLORS['food'], label='Food', edgecolor='white', linewidth=0.3)
+    ax.set_yticks(range(len(df_mix)))
+    ax.set_yticklabels(df_mix.index, fontsize=8)
+    ax.set_title('Revenue Mix: Beverages vs Food by Branch', fontsize=14, fontweight='bold', pad=15)
+    ax.set_xlabel('Share (%)')
+    ax.legend(loc='lower right')
+    return _save(out_dir, '09_bev_food_mix.png')
+
+
+# --- CHART 10: Modifier Profitability ---
+def chart_modifiers(data, out_dir):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    top_mods = data['df_modifiers'].head(12).sort_values('Total Profit', ascending=True)
+    ax.barh(range(len(top_mods)), top_mods['Total Profit'], color=COLORS['accent'], edgecolor='white', linewidth=0.3)
+    ax.set_yticks(range(len(top_mods)))
+    ax.set_yticklabels(top_mods['Product'], fontsize=8)
+    ax.set_title('Top Modifiers by Profit (Upsell Opportunities)', fontsize=14, fontweight='bold', pad=15)
+    ax.xaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f'{x/1e6:.1f}M'))
+    return _save(out_dir, '10_modifiers.png')
+
+
+# --- CHART 11: New Branch Ramp-up ---
+def chart_new_branches(data, out_dir):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    for branch, vals in data['ramp_up'].items():
+        ax.plot(range(len(MONTHS)), vals, marker='o', markersize=3, label=branch, linewidth=1.5)
+
+    ax.set_xticks(range(len(MONTHS)))
+    ax.set_xticklabels([m[:3] for m in MONTHS], fontsize=9)
+    ax.set_title('New Branch Ramp-Up Curves (2025)', fontsize=14, fontweight='bold', pad=15)
+    ax.set_ylabel('Monthly Revenue')
+    ax.yaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f'{x/1e6:.0f}M'))
+    ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=8)
+    return _save(out_dir, '11_new_branches.png')
+
+
+# --- CHART 12: YoY Heatmap (branch x month) ---
+def chart_yoy_heatmap(data, out_dir):
+    if data['yoy_heatmap'] is None:
+        return None
+    matrix = data['yoy_heatmap'].dropna(axis=1, how='all')
+    if matrix.empty:
+        return None
+
+    import seaborn as sns
+    fig, ax = plt.subplots(figsize=(max(6, 1.1 * matrix.shape[1] + 4), max(4, 0.3 * len(matrix) + 1.5)))
+    sns.heatmap(matrix.rename(columns=lambda m: m[:3]), ax=ax, cmap='RdYlGn', center=0,
+                annot=True, fmt='+.0f', annot_kws={'fontsize': 7}, linewidths=0.5,
+                cbar_kws={'label': 'YoY Change (%)'})
+    prev_year, curr_year = data['yoy_pair']
+    ax.set_title(f'Year-over-Year Change by Branch and Month: {prev_year} → {curr_year}', fontsize=14, fontweight='bold', pad=15)
+    ax.set_xlabel('')
+    ax.set_ylabel('')
+    return _save(out_dir, '12_yoy_heatmap.png')
+
+
+# --- Branch pack: one branch's seasonality against the chain average ---
+def chart_branch_seasonality(data, out_dir):
+    """Not part of CHARTS: drawn per branch by branch_summary.py."""
+    month_vals = data['months']
+    active = [v for v in month_vals if v > 0]
+    if not active:
+        return None
+
+    fig, ax = plt.subplots(figsize=(12, 5))
+    peak, trough = max(active), min(active)
+    ax.bar(range(len(MONTHS)), month_vals, color=[COLORS['accent'] if v == peak else COLORS['highlight'] if v == trough else COLORS['primary'] for v in month_vals], edgecolor='white', linewidth=0.5, label=data['branch'])
+    ax.plot(range(len(MONTHS)), data['chain_avg'], color=COLORS['warm'], linestyle='--', marker='o', markersize=3, label='Chain average per branch')
+    ax.set_xticks(range(len(MONTHS)))
+    ax.set_xticklabels([m[:3] for m in MONTHS], fontsize=9)
+    ax.set_title(f"{data['branch']}: Monthly Revenue ({data['year']})", fontsize=14, fontweight='bold', pad=15)
+    ax.set_ylabel('Revenue (Arbitrary Units)')
+    ax.yaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f'{x/1e6:.0f}M'))
+    ax.legend(loc='upper left', fontsize=9)
+    return _save(out_dir, 'branch_seasonality.png')
+
+
+CHARTS = [
+    chart_seasonality,
+    chart_branch_profit,
+    chart_margin_by_branch,
+    chart_bev_vs_food,
+    chart_top_products,
+    chart_product_groups,
+    chart_yoy_comparison,
+    chart_menu_engineering,
+    chart_bev_food_mix,
+    chart_modifiers,
+    chart_new_branches,
+    chart_yoy_heatmap,
+]
+
+
+# ============================================================
+# RENDERING
+# ============================================================
+def render_chart(chart, data, out_dir):
+    """Draw one chart; returns (chart name, file name or None if skipped, error text or None)."""
+    try:
+        return chart.__name__, chart(data, out_dir), None
+    except Exception:
+        plt.close('all')
+        return chart.__name__, None, traceback.format_exc()
+
+
+def render_image(chart, data, size=None, dpi=150, fmt='png'):
+    """Draw one chart into memory; returns (file name, image bytes), both None if the chart was skipped.
+
+    `size` is the (width, height) in inches the image will occupy; `fmt` is
+    any matplotlib format ('png', 'svg', 'pdf').
+    """
+    target = MemoryTarget(size, dpi, fmt)
+    fname = chart(data, target)
+    return fname, target.data if fname else None
+
+
+def render_all(data, out_dir, workers=None, charts=CHARTS, executor=None):
+    """Render `charts` over `data`, on a process pool unless `workers` is 1.
+
+    Returns one (chart name, file name, error) tuple per chart in `charts`
+    order; a failing chart does not stop the others. Pass a long-lived
+    `executor` (started with initializer=setup_style) to reuse its workers
+    across calls instead of starting a pool per call.
+
+    Under an active instrument recorder each chart is a 'chart.<name>' stage,
+    recorded in the worker that drew it.
+    """
+    rec = instrument.active()
+    if executor is not None:
+        return _collect(charts, [_submit(executor, rec, chart, data, out_dir) for chart in charts], rec)
+    if workers is None:
+        workers = chart_workers(len(charts))
+    if workers <= 1:
+        setup_style()
+        results = []
+        for chart in charts:
+            with rec.stage(f'chart.{chart.__name__}'):
+                results.append(render_chart(chart, data, out_dir))
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=setup_style) as pool:
+        return _collect(charts, [_submit(pool, rec, chart, data, out_dir) for chart in charts], rec)
+
+
+def chart_workers(n_charts=len(CHARTS)):
+    """Pool size: STORIES_CHART_WORKERS, else one per chart up to the CPU count."""
+    return int(os.environ.get('STORIES_CHART_WORKERS', 0)) or min(n_charts, os.cpu_count() or 1)
+
+
+def _submit(pool, rec, chart, data, out_dir):
+    if not rec.enabled:
+        return pool.submit(render_chart, chart, data, out_dir)
+    return pool.submit(instrument.remote_stage, f'chart.{chart.__name__}', render_chart, chart, data, out_dir,
+                       trace_memory=rec.trace_memory)
+
+
+def _collect(charts, futures, rec=instrument.NULL):
+    results = []
+    for chart, future in zip(charts, futures):
+        try:
+            result = future.result()
+        except Exception as e:  # worker died or data failed to pickle
+            result = (chart.__name__, None, f'{type(e).__name__}: {e}')
+        else:
+            if rec.enabled:
+                result, records = result
+                rec.adopt(records)
+        results.append(result)
+    return results
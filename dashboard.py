@@ -1,15 +1,19 @@
 """
 Stories Coffee — Analytics Dashboard
 Run: streamlit run dashboard.py
+
+plotly is imported by the page that draws with it, so a cold boot only pays
+for the modules of the page it lands on.
 """
 
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import re, os, io
+import os, io
+from stories_io.parsers import MONTHS
+from stories_io.cache import source_digest, load_reports_cached
+from stories_io.analytics import product_totals, group_totals, group_summary
+from stories_io import cube, rollup, rowindex
 
 # ============================================================
 # CONFIG
@@ -83,201 +87,45 @@ COLORS = {
     'teal': '#2DD4BF',
     'pink': '#F472B6',
 }
+YOY_WINDOWS = {'month': 'Month', 'rolling3': 'Rolling 3 months', 'ytd': 'Year to date'}
 PALETTE = ['#22D3A7', '#3B82F6', '#F59E42', '#A78BFA', '#EF4444', '#2DD4BF', '#F472B6', '#FBBF24', '#6366F1', '#10B981']
 
 
 # ============================================================
 # DATA PARSING
 # ============================================================
-def normalize_branch(name):
-    if pd.isna(name): return name
-    name = str(name).strip()
-    name = re.sub(r'^Stories\s*[-]?\s*', '', name, flags=re.IGNORECASE).strip().title()
-    fixes = {'Alay': 'Aley', 'Lau': 'LAU', '.': 'Closed/Temp', '': 'Closed/Temp'}
-    return fixes.get(name, name)
-
-def parse_num(val):
-    if pd.isna(val): return 0.0
-    try: return float(str(val).replace(',', '').strip())
-    except: return 0.0
+@st.cache_data(show_spinner=False)
+def path_digest(path, mtime_ns, size):
+    """Content digest of a default-path export, re-hashed only when the file changes."""
+    return source_digest(path)
 
-@st.cache_data
-def load_data(f1_path, f2_path, f3_path, f4_path):
-    """Parse all 4 CSV files and return structured DataFrames."""
-    data = {}
-    
-    # ---- FILE 1: Monthly Sales ----
-    with open(f1_path, 'r', encoding='utf-8-sig') as f:
-        content = f.read()
-    
-    lines = content.split('\n')
-    branch_data = {}
-    current_year = None
-    section_months = None
-    
-    for line in lines:
-        line = line.strip()
-        if not line: continue
-        
-        parts = [p.strip().strip('"') for p in re.split(r',(?=(?:[^"]*"[^"]*")*[^"]*$)', line)]
-        
-        if 'Page ' in line or line.startswith('Stories,,,') or 'Comparative' in line or '22-Jan' in line:
-            continue
-        
-        if 'January' in line or 'October' in line:
-            if 'Total By Year' in line:
-                section_months = ['October', 'November', 'December', 'Total By Year']
-            elif 'January' in line:
-                section_months = ['January','February','March','April','May','June','July','August','September']
-            continue
-        
-        year_val = None
-        branch_name = None
-        data_start = None
-        
-        if parts[0] in ['2025', '2026']:
-            current_year = int(parts[0])
-            branch_name = parts[1] if len(parts) > 1 else None
-            data_start = 2
-        elif parts[0] == '' and len(parts) > 1 and parts[1]:
-            branch_name = parts[1]
-            data_start = 2
+
+def content_digests(sources):
+    digests = {}
+    for key, source in sources.items():
+        if isinstance(source, bytes):
+            digests[key] = source_digest(source)
         else:
-            continue
-        
-        if not branch_name or branch_name == 'Total': continue
-        branch = normalize_branch(branch_name)
-        
-        if section_months is None:
-            section_months = ['January','February','March','April','May','June','July','August','September']
-        
-        vals = []
-        for p in parts[data_start:]:
-            p_clean = p.replace(',', '').strip()
-            if p_clean and p_clean not in ['Total By Year']:
-                try: vals.append(float(p_clean))
-                except: pass
-        
-        key = (current_year, branch)
-        if key not in branch_data: branch_data[key] = {}
-        for i, month in enumerate(section_months):
-            if i < len(vals):
-                branch_data[key][month] = vals[i]
-    
-    rows = []
-    for (year, branch), months_dict in branch_data.items():
-        row = {'Year': year, 'Branch': branch}
-        row.update(months_dict)
-        rows.append(row)
-    
-    df_monthly = pd.DataFrame(rows)
-    df_monthly = df_monthly[df_monthly['Branch'] != 'Total']
-    data['monthly'] = df_monthly
-    
-    # ---- FILE 4: Category Summary ----
-    cat_records = []
-    current_branch = None
-    with open(f4_path, 'r', encoding='utf-8-sig') as f:
-        for line in f:
-            line = line.strip()
-            if not line or 'Page ' in line or 'Theoretical' in line or '22-Jan' in line or line.startswith('Category,'): continue
-            if 'Copyright' in line: continue
-            
-            parts = [p.strip().strip('"') for p in re.split(r',(?=(?:[^"]*"[^"]*")*[^"]*$)', line)]
-            
-            if parts[0].startswith('Stories') and (len(parts) < 3 or parts[1] == ''):
-                current_branch = normalize_branch(parts[0])
-                continue
-            
-            cat = parts[0].strip()
-            if cat in ['BEVERAGES', 'FOOD'] or cat.startswith('Total By Branch'):
-                qty = parse_num(parts[1])
-                total_cost = parse_num(parts[4])
-                cost_pct = parse_num(parts[5])
-                total_profit = parse_num(parts[6])
-                profit_pct = parse_num(parts[8])
-                true_revenue = total_cost + total_profit
-                
-                label = cat if cat in ['BEVERAGES', 'FOOD'] else 'TOTAL'
-                cat_records.append({
-                    'Branch': current_branch, 'Category': label,
-                    'Qty': qty, 'Revenue': true_revenue,
-                    'Total Cost': total_cost, 'Cost %': cost_pct,
-                    'Total Profit': total_profit, 'Profit %': profit_pct
-                })
-    
-    data['category'] = pd.DataFrame(cat_records)
-    
-    # ---- FILE 2: Product Profitability ----
-    product_records = []
-    current_branch = current_service = current_category = current_section = None
-    
-    with open(f2_path, 'r', encoding='utf-8-sig') as f:
-        for line in f:
-            line = line.strip()
-            if not line or 'Page ' in line or 'Theoretical' in line or '22-Jan' in line or line.startswith('Product Desc,'): continue
-            if 'Copyright' in line: continue
-            
-            parts = [p.strip().strip('"') for p in re.split(r',(?=(?:[^"]*"[^"]*")*[^"]*$)', line)]
-            name = parts[0].strip()
-            
-            if name.startswith('Stories') and (len(parts) < 3 or parts[1] == ''):
-                current_branch = normalize_branch(name); continue
-            if name in ['TAKE AWAY', 'TABLE']: current_service = name; continue
-            if name in ['BEVERAGES', 'FOOD']: current_category = name; continue
-            if 'SECTION' in name or name in ['HOT BAR SECTION', 'COLD BAR SECTION', 'DONUTS', 'FOOD SECTION', 'GRAB AND GO']:
-                current_section = name; continue
-            if name.startswith('Total By') or name.startswith('Total:'): continue
-            
-            if len(parts) >= 9:
-                qty = parse_num(parts[1])
-                total_cost = parse_num(parts[4])
-                total_profit = parse_num(parts[6])
-                profit_pct = parse_num(parts[8])
-                
-                if qty > 0:
-                    product_records.append({
-                        'Branch': current_branch, 'Service': current_service,
-                        'Category': current_category, 'Section': current_section,
-                        'Product': name, 'Qty': qty,
-                        'Total Cost': total_cost, 'Total Profit': total_profit,
-                        'Profit %': profit_pct, 'Revenue': total_cost + total_profit
-                    })
-    
-    data['products'] = pd.DataFrame(product_records)
-    
-    # ---- FILE 3: Sales by Groups ----
-    group_records = []
-    current_branch = current_division = current_group = None
-    
-    with open(f3_path, 'r', encoding='utf-8-sig') as f:
-        for line in f:
-            line = line.strip()
-            if not line or 'Page ' in line or 'Sales by Items' in line or '19-Jan' in line or line.startswith('Description,'): continue
-            if 'Copyright' in line: continue
-            
-            parts = [p.strip().strip('"') for p in re.split(r',(?=(?:[^"]*"[^"]*")*[^"]*$)', line)]
-            name = parts[0].strip()
-            
-            if name.startswith('Branch:'): current_branch = normalize_branch(name.replace('Branch:', '').strip()); continue
-            if name.startswith('Division:'): current_division = name.replace('Division:', '').strip(); continue
-            if name.startswith('Group:'): current_group = name.replace('Group:', '').strip(); continue
-            if name.startswith('Total by'): continue
-            
-            if len(parts) >= 4:
-                qty = parse_num(parts[2])
-                total_amount = parse_num(parts[3])
-                if qty > 0:
-                    group_records.append({
-                        'Branch': current_branch, 'Division': current_division,
-                        'Group': current_group, 'Product': name,
-                        'Qty': qty, 'Total Amount': total_amount
-                    })
-    
-    data['groups'] = pd.DataFrame(group_records)
-    
+            stat = os.stat(source)
+            digests[key] = path_digest(source, stat.st_mtime_ns, stat.st_size)
+    return digests
+
+
+@st.cache_data
+def load_data(digests, _sources):
+    """Parse all 4 exports (paths or uploaded bytes), cached on their content digests."""
+    data = load_reports_cached(_sources, digests=digests)
+    data['product_rollup'] = rollup.load_rollup_cached(data['products'], digests['products'])
+    data['product_index'] = rowindex.build_row_index(data['products'], ['Branch', 'Service'])
     return data
 
+
+def load_sources(sources):
+    """Parsed frames plus a fingerprint of their contents for the analytics cache."""
+    digests = content_digests(sources)
+    fingerprint = '-'.join(digests[key][:16] for key in sorted(digests))
+    return load_data(digests, sources), fingerprint
+
 # ============================================================
 # LOAD DATA — try uploaded files, then fall back to default paths
 # ============================================================
@@ -296,15 +144,9 @@ if use_upload:
     f4_up = st.sidebar.file_uploader("Category Summary (rep_s_00673)", type="csv", key="f4")
     
     if all([f1_up, f2_up, f3_up, f4_up]):
-        # Save uploaded files temporarily
-        os.makedirs('/tmp/stories_data', exist_ok=True)
-        paths = {}
-        for name, upfile in [('f1', f1_up), ('f2', f2_up), ('f3', f3_up), ('f4', f4_up)]:
-            path = f'/tmp/stories_data/{name}.csv'
-            with open(path, 'wb') as f:
-                f.write(upfile.getvalue())
-            paths[name] = path
-        data = load_data(paths['f1'], paths['f2'], paths['f3'], paths['f4'])
+        # Parse straight from the uploaded bytes, keyed on their content
+        data, fingerprint = load_sources({'monthly': f1_up.getvalue(), 'products': f2_up.getvalue(),
+                                          'groups': f3_up.getvalue(), 'category': f4_up.getvalue()})
         st.sidebar.success("✅ Files loaded successfully!")
     else:
         st.info("⬆️ Upload all 4 CSV files in the sidebar to proceed.")
@@ -321,7 +163,7 @@ else:
     loaded = False
     for p1, p2, p3, p4 in default_paths:
         if all(os.path.exists(p) for p in [p1, p2, p3, p4]):
-            data = load_data(p1, p2, p3, p4)
+            data, fingerprint = load_sources({'monthly': p1, 'products': p2, 'groups': p3, 'category': p4})
             loaded = True
             break
     
@@ -333,57 +175,108 @@ else:
 # ============================================================
 # PRECOMPUTE ANALYTICS
 # ============================================================
-df_monthly = data['monthly']
-df_category = data['category']
-df_products = data['products']
-df_groups = data['groups']
-
-df_2025 = df_monthly[df_monthly['Year'] == 2025].copy()
-df_2026 = df_monthly[df_monthly['Year'] == 2026].copy()
-
-months_order = ['January','February','March','April','May','June','July','August','September','October','November','December']
-month_cols = [m for m in months_order if m in df_2025.columns]
-
-# Monthly totals
-monthly_totals = {m: df_2025[m].sum() for m in month_cols}
-total_2025 = df_2025['Total By Year'].sum() if 'Total By Year' in df_2025.columns else sum(monthly_totals.values())
-
-# Branch totals
-df_branch_totals = df_category[df_category['Category'] == 'TOTAL'].sort_values('Total Profit', ascending=False).copy()
-df_branch_totals['Profit per Unit'] = df_branch_totals['Total Profit'] / df_branch_totals['Qty']
-
-# Category
-df_bev = df_category[df_category['Category'] == 'BEVERAGES']
-df_food = df_category[df_category['Category'] == 'FOOD']
-bev_profit = df_bev['Total Profit'].sum()
-food_profit = df_food['Total Profit'].sum()
-bev_rev = df_bev['Revenue'].sum()
-food_rev = df_food['Revenue'].sum()
-bev_margin = bev_profit / bev_rev * 100 if bev_rev > 0 else 0
-food_margin = food_profit / food_rev * 100 if food_rev > 0 else 0
-
-# Products aggregated
-df_prod_agg = df_products.groupby('Product').agg({'Qty': 'sum', 'Total Cost': 'sum', 'Total Profit': 'sum', 'Revenue': 'sum'}).reset_index()
-df_prod_agg['Profit Margin'] = np.where(df_prod_agg['Revenue'] > 0, df_prod_agg['Total Profit'] / df_prod_agg['Revenue'] * 100, -999)
-df_prod_agg['Avg Price'] = np.where(df_prod_agg['Qty'] > 0, df_prod_agg['Revenue'] / df_prod_agg['Qty'], 0)
-
-df_core_products = df_prod_agg[(~df_prod_agg['Product'].str.startswith('ADD ')) & (df_prod_agg['Qty'] >= 100)].copy()
-
-# Groups
-df_group_summary = df_groups.groupby('Group').agg({'Qty': 'sum', 'Total Amount': 'sum'}).reset_index().sort_values('Total Amount', ascending=False)
-
-# YoY
-jan_2025 = df_2025[['Branch', 'January']].rename(columns={'January': 'Jan_2025'})
-jan_2026 = df_2026[['Branch', 'January']].rename(columns={'January': 'Jan_2026'})
-jan_compare = jan_2025.merge(jan_2026, on='Branch', how='inner')
-jan_compare = jan_compare[(jan_compare['Jan_2025'] > 0) & (jan_compare['Jan_2026'] > 0)].copy()
-jan_compare['YoY %'] = (jan_compare['Jan_2026'] - jan_compare['Jan_2025']) / jan_compare['Jan_2025'] * 100
-
-# Bev/Food mix
-df_mix = df_category[df_category['Category'].isin(['BEVERAGES', 'FOOD'])].pivot_table(
-    index='Branch', columns='Category', values='Revenue', aggfunc='sum').fillna(0)
-df_mix['Bev %'] = df_mix['BEVERAGES'] / (df_mix['BEVERAGES'] + df_mix['FOOD']) * 100
-df_mix = df_mix.sort_values('Bev %', ascending=False).reset_index()
+# Each section is built once per data fingerprint and section, so a widget
+# click only re-renders; pages ask for the sections they draw.
+months_order = MONTHS
+
+
+def monthly_section(data):
+    revenue_cube = cube.build_cube(data['monthly'])
+
+    # Monthly totals
+    monthly_totals = cube.monthly_totals(revenue_cube, 2025)
+    total_2025 = revenue_cube.totals[revenue_cube.year_index[2025]].sum() if 2025 in revenue_cube.year_index else 0.0
+
+    # YoY (January of the two latest years)
+    jan_compare = cube.month_compare(revenue_cube).rename(columns={'YoY Change %': 'YoY %'})
+    yoy_tables = {window: cube.yoy(revenue_cube, window) for window in cube.WINDOWS}
+
+    return {'revenue_cube': revenue_cube, 'monthly_totals': monthly_totals, 'total_2025': total_2025,
+            'jan_compare': jan_compare, 'yoy_tables': yoy_tables, 'n_branches': len(revenue_cube.branches)}
+
+
+def category_section(data):
+    df_category = data['category']
+
+    # Branch totals
+    df_branch_totals = df_category[df_category['Category'] == 'TOTAL'].sort_values('Total Profit', ascending=False).copy()
+    df_branch_totals['Profit per Unit'] = df_branch_totals['Total Profit'] / df_branch_totals['Qty']
+
+    # Category
+    df_bev = df_category[df_category['Category'] == 'BEVERAGES']
+    df_food = df_category[df_category['Category'] == 'FOOD']
+    bev_profit = df_bev['Total Profit'].sum()
+    food_profit = df_food['Total Profit'].sum()
+    bev_rev = df_bev['Revenue'].sum()
+    food_rev = df_food['Revenue'].sum()
+    bev_margin = bev_profit / bev_rev * 100 if bev_rev > 0 else 0
+    food_margin = food_profit / food_rev * 100 if food_rev > 0 else 0
+
+    # Bev/Food mix
+    df_mix = df_category[df_category['Category'].isin(['BEVERAGES', 'FOOD'])].pivot_table(
+        index='Branch', columns='Category', values='Revenue', aggfunc='sum').fillna(0)
+    df_mix['Bev %'] = df_mix['BEVERAGES'] / (df_mix['BEVERAGES'] + df_mix['FOOD']) * 100
+    df_mix = df_mix.sort_values('Bev %', ascending=False).reset_index()
+
+    return {'df_branch_totals': df_branch_totals, 'bev_profit': bev_profit, 'food_profit': food_profit,
+            'bev_margin': bev_margin, 'food_margin': food_margin, 'df_mix': df_mix}
+
+
+def product_section(data, scope=None):
+    # Products aggregated: chain-wide from the rollup, a scope from just its rows
+    if scope:
+        branches, service = scope
+        df_rows = rowindex.take(data['products'], data['product_index'], Branch=branches or None, Service=service)
+        df_prod_agg = product_totals(df_rows).reset_index()
+    else:
+        df_rows = data['products']
+        df_prod_agg = rollup.query(data['product_rollup'], ['Product'])
+    df_prod_agg['Profit Margin'] = np.where(df_prod_agg['Revenue'] > 0, df_prod_agg['Total Profit'] / df_prod_agg['Revenue'] * 100, -999)
+    df_prod_agg['Avg Price'] = np.where(df_prod_agg['Qty'] > 0, df_prod_agg['Revenue'] / df_prod_agg['Qty'], 0)
+
+    df_core_products = df_prod_agg[(~df_prod_agg['Product'].str.startswith('ADD ')) & (df_prod_agg['Qty'] >= 100)].copy()
+
+    return {'df_prod_agg': df_prod_agg, 'df_core_products': df_core_products,
+            'n_all_products': df_rows['Product'].nunique()}
+
+
+def growth_section(data):
+    revenue_cube = monthly_section(data)['revenue_cube']
+    df_branch_totals = category_section(data)['df_branch_totals']
+    df_new_branches = cube.new_branches(revenue_cube, 2025)
+    return {'df_new_branches': df_new_branches,
+            'ramp_up': cube.ramp_up(revenue_cube, 2025, df_new_branches['Branch']),
+            'df_scorecard': cube.expansion_scorecard(revenue_cube, 2025, df_branch_totals)}
+
+
+def group_section(data):
+    return {'df_group_summary': group_summary(group_totals(data['groups']))}
+
+
+SECTIONS = {
+    'monthly': monthly_section,
+    'category': category_section,
+    'products': product_section,
+    'groups': group_section,
+    'growth': growth_section,
+}
+# Sections that follow the sidebar's branch / service scope
+SCOPED_SECTIONS = {'products'}
+
+
+@st.cache_data(show_spinner=False)
+def build_analytics(fingerprint, section, scope, _data):
+    """Derived frames of one SECTIONS entry; `_data` is keyed by `fingerprint`, not hashed."""
+    if section in SCOPED_SECTIONS:
+        return SECTIONS[section](_data, scope)
+    return SECTIONS[section](_data)
+
+
+def analytics(*sections):
+    out = {}
+    for section in sections:
+        out.update(build_analytics(fingerprint, section, product_scope if section in SCOPED_SECTIONS else None, data))
+    return out
 
 
 # ============================================================
@@ -392,6 +285,15 @@ df_mix = df_mix.sort_values('Bev %', ascending=False).reset_index()
 st.sidebar.markdown("### 📊 Navigation")
 page = st.sidebar.radio("", ["📈 Overview", "📍 Branch Analysis", "☕ Product Deep-Dive", "🚀 Growth & Expansion", "🎯 Recommendations"], label_visibility="collapsed")
 
+st.sidebar.markdown("### 🔍 Product Scope")
+scope_branches = st.sidebar.multiselect("Branches", sorted(rowindex.key_values(data['product_index'], 'Branch')),
+                                        placeholder="All branches")
+scope_service = st.sidebar.selectbox("Service", ["All services"] + sorted(rowindex.key_values(data['product_index'], 'Service')))
+# None = chain-wide; otherwise (branches, service), hashable for the analytics cache
+product_scope = None
+if scope_branches or scope_service != "All services":
+    product_scope = (tuple(scope_branches), None if scope_service == "All services" else scope_service)
+
 st.sidebar.markdown("---")
 st.sidebar.markdown(
     "<div style='font-size:0.75rem; color:#888;'>"
@@ -406,13 +308,20 @@ st.sidebar.markdown(
 # PAGE: OVERVIEW
 # ============================================================
 if page == "📈 Overview":
+    import plotly.express as px
+    import plotly.graph_objects as go
+    a = analytics('monthly', 'category', 'groups')
+    monthly_totals, total_2025, jan_compare = a['monthly_totals'], a['total_2025'], a['jan_compare']
+    bev_profit, food_profit, bev_margin, food_margin = a['bev_profit'], a['food_profit'], a['bev_margin'], a['food_margin']
+    df_group_summary = a['df_group_summary']
+
     st.markdown("# ☕ Stories Coffee Analytics Dashboard")
     st.markdown("*Transforming POS data into actionable growth insights across 25 branches and 300+ products*")
     
     # KPIs
     c1, c2, c3, c4 = st.columns(4)
     c1.metric("2025 Total Revenue", f"{total_2025/1e6:.1f}M", help="Arbitrary units")
-    c2.metric("Active Branches", f"{df_monthly['Branch'].nunique()}", "11 new in 2025")
+    c2.metric("Active Branches", f"{a['n_branches']}", "11 new in 2025")
     c3.metric("Beverage Margin", f"{bev_margin:.1f}%", f"+{bev_margin-food_margin:.0f}pp vs Food")
     
     avg_yoy = jan_compare['YoY %'].mean() if len(jan_compare) > 0 else 0
@@ -432,7 +341,8 @@ if page == "📈 Overview":
         })
         
         peak_val = df_season['Revenue'].max()
-        trough_val = df_season[df_season['Revenue'] > 0]['Revenue'].min()
+        selling = df_season[df_season['Revenue'] > 0]['Revenue']
+        trough_val = selling.min() if len(selling) else peak_val
         
         colors = ['#22D3A7' if v == peak_val else '#EF4444' if v == trough_val else '#3B82F6' for v in df_season['Revenue']]
         
@@ -512,6 +422,11 @@ if page == "📈 Overview":
 # PAGE: BRANCH ANALYSIS
 # ============================================================
 elif page == "📍 Branch Analysis":
+    import plotly.express as px
+    import plotly.graph_objects as go
+    a = analytics('category', 'monthly')
+    df_branch_totals, df_mix, jan_compare = a['df_branch_totals'], a['df_mix'], a['jan_compare']
+
     st.markdown("# 📍 Branch Performance Analysis")
     
     c1, c2, c3 = st.columns(3)
@@ -588,12 +503,48 @@ elif page == "📍 Branch Analysis":
             </div>
             """, unsafe_allow_html=True)
 
+    st.subheader("🗓️ YoY Change by Branch and Month")
+    yoy_tables = a['yoy_tables']
+    hc1, hc2 = st.columns([2, 1])
+    window = hc1.radio("Window:", list(YOY_WINDOWS), format_func=YOY_WINDOWS.get, horizontal=True)
+    pairs = list(cube.yoy_summary(yoy_tables['month'])[['Prev Year', 'Year']].drop_duplicates().itertuples(index=False, name=None))
+    if pairs:
+        pair = hc2.selectbox("Years:", pairs, index=len(pairs) - 1, format_func=lambda p: f"{p[0]} → {p[1]}")
+        matrix = cube.yoy_matrix(yoy_tables[window], *pair).dropna(axis=1, how='all')
+    else:
+        matrix = pd.DataFrame()
+
+    if matrix.empty:
+        st.info("No branch has sales in both years for this window yet.")
+    else:
+        fig = go.Figure(go.Heatmap(
+            z=matrix.values, x=[m[:3] for m in matrix.columns], y=matrix.index,
+            colorscale='RdYlGn', zmid=0,
+            text=[[f"{v:+.0f}%" if v == v else "" for v in row] for row in matrix.values],
+            texttemplate="%{text}", colorbar=dict(title='YoY %'),
+        ))
+        fig.update_layout(
+            height=max(300, 28 * len(matrix) + 100), template='plotly_dark',
+            paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+            yaxis_autorange='reversed', margin=dict(t=20),
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
 
 # ============================================================
 # PAGE: PRODUCT DEEP-DIVE
 # ============================================================
 elif page == "☕ Product Deep-Dive":
+    import plotly.express as px
+    a = analytics('products')
+    df_prod_agg, df_core_products = a['df_prod_agg'], a['df_core_products']
+
     st.markdown("# ☕ Product Profitability Deep-Dive")
+    if product_scope:
+        st.caption(f"Scope: {', '.join(product_scope[0]) or 'All branches'} · {product_scope[1] or 'All services'}")
+    if df_core_products.empty:
+        st.info("No products with meaningful volume in this scope.")
+        st.stop()
     
     c1, c2, c3 = st.columns(3)
     top_prod = df_core_products.sort_values('Total Profit', ascending=False).iloc[0]
@@ -603,11 +554,11 @@ elif page == "☕ Product Deep-Dive":
     c2.metric("🔴 Combo Losses", f"{loss_total/1e6:.0f}M", "10 loss-making toppings", delta_color="inverse")
     
     n_products = df_core_products['Product'].nunique()
-    c3.metric("📦 Products Analyzed", f"{n_products}", f"{df_products['Product'].nunique()} total incl. modifiers")
+    c3.metric("📦 Products Analyzed", f"{n_products}", f"{a['n_all_products']} total incl. modifiers")
     
     st.markdown("---")
     
-    tab1, tab2, tab3, tab4 = st.tabs(["🏆 Top Performers", "🔴 Loss Makers", "📊 Menu Matrix", "🔧 Modifiers"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["🏆 Top Performers", "🔴 Loss Makers", "📊 Menu Matrix", "🔧 Modifiers", "🔎 Drill-down"])
     
     with tab1:
         st.subheader("Top 15 Products by Gross Profit")
@@ -719,11 +670,44 @@ elif page == "☕ Product Deep-Dive":
         </div>
         """, unsafe_allow_html=True)
 
+    with tab5:
+        st.subheader("Branch → Section → Product Drill-down")
+        product_rollup = data['product_rollup']
+
+        dc1, dc2 = st.columns(2)
+        path = {'Service': product_scope[1]} if product_scope and product_scope[1] else {}
+        branches = rollup.drill_down(product_rollup, path, 'Branch')['Branch'].tolist()
+        if product_scope and product_scope[0]:
+            branches = [b for b in branches if b in product_scope[0]]
+            path['Branch'] = list(product_scope[0])
+        branches = ['All branches'] + branches
+        branch = dc1.selectbox("Branch:", branches)
+        if branch != branches[0]:
+            path['Branch'] = branch
+        sections = ['All sections'] + rollup.drill_down(product_rollup, path, 'Section')['Section'].tolist()
+        section = dc2.selectbox("Section:", sections)
+        if section != sections[0]:
+            path['Section'] = section
+
+        totals = rollup.query(product_rollup, where=path).iloc[0]
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Revenue", f"{totals['Revenue']/1e6:.1f}M")
+        m2.metric("Gross Profit", f"{totals['Total Profit']/1e6:.1f}M")
+        m3.metric("Units Sold", f"{totals['Qty']:,.0f}")
+
+        df_drill = rollup.drill_down(product_rollup, path, 'Product')
+        st.dataframe(df_drill[['Product', 'Qty', 'Revenue', 'Total Profit', 'Profit Margin', 'Avg Price']].style.format({
+            'Qty': '{:,.0f}', 'Revenue': '{:,.0f}', 'Total Profit': '{:,.0f}', 'Profit Margin': '{:.1f}%', 'Avg Price': '{:,.0f}',
+        }, na_rep='—'), use_container_width=True, hide_index=True)
+
 
 # ============================================================
 # PAGE: GROWTH & EXPANSION
 # ============================================================
 elif page == "🚀 Growth & Expansion":
+    import plotly.graph_objects as go
+    a = analytics('growth')
+
     st.markdown("# 🚀 Growth & Expansion Analysis")
     
     c1, c2, c3 = st.columns(3)
@@ -736,15 +720,7 @@ elif page == "🚀 Growth & Expansion":
     # New branch ramp-up
     st.subheader("📈 New Branch Ramp-Up Curves")
     
-    new_branch_names = []
-    for _, row in df_2025.iterrows():
-        first_month = None
-        for m in months_order:
-            if m in row and row[m] > 0:
-                first_month = m
-                break
-        if first_month and first_month != 'January':
-            new_branch_names.append(row['Branch'])
+    new_branch_names = a['df_new_branches']['Branch'].tolist()
     
     if new_branch_names:
         selected_branches = st.multiselect(
@@ -755,15 +731,12 @@ elif page == "🚀 Growth & Expansion":
         
         fig = go.Figure()
         for i, branch in enumerate(selected_branches):
-            branch_row = df_2025[df_2025['Branch'] == branch]
-            if len(branch_row) > 0:
-                vals = [branch_row[m].values[0] if m in branch_row.columns else 0 for m in months_order]
-                fig.add_trace(go.Scatter(
-                    x=[m[:3] for m in months_order], y=vals,
-                    mode='lines+markers', name=branch,
-                    line=dict(color=PALETTE[i % len(PALETTE)], width=2.5),
-                    marker=dict(size=6),
-                ))
+            fig.add_trace(go.Scatter(
+                x=[m[:3] for m in months_order], y=a['ramp_up'][branch],
+                mode='lines+markers', name=branch,
+                line=dict(color=PALETTE[i % len(PALETTE)], width=2.5),
+                marker=dict(size=6),
+            ))
         
         fig.update_layout(
             height=420, template='plotly_dark',
@@ -786,34 +759,10 @@ elif page == "🚀 Growth & Expansion":
     st.markdown("---")
     st.subheader("📋 Expansion Scorecard")
     
-    scorecard_data = []
-    for _, row in df_2025.iterrows():
-        first_month = None
-        for m in months_order:
-            if m in row and row[m] > 0:
-                first_month = m
-                break
-        if first_month and first_month != 'January':
-            dec_rev = row.get('December', 0)
-            branch_cat = df_branch_totals[df_branch_totals['Branch'] == row['Branch']]
-            margin = branch_cat['Profit %'].values[0] if len(branch_cat) > 0 else 0
-            total = row.get('Total By Year', 0)
-            
-            if total > 30000000: assessment = "🟢 Star"
-            elif total > 15000000: assessment = "🟡 Solid"
-            elif total > 5000000: assessment = "🔵 Early"
-            else: assessment = "⚪ Minimal"
-            
-            scorecard_data.append({
-                'Branch': row['Branch'],
-                'Opened': first_month[:3],
-                'Dec Revenue': f"{dec_rev/1e6:.1f}M" if dec_rev > 0 else "—",
-                'Annual': f"{total/1e6:.1f}M",
-                'Margin': f"{margin:.1f}%",
-                'Assessment': assessment,
-            })
-    
-    df_score = pd.DataFrame(scorecard_data).sort_values('Annual', ascending=False)
+    df_score = a['df_scorecard'].copy()
+    df_score['Dec Revenue'] = [f"{v/1e6:.1f}M" if v > 0 else "—" for v in df_score['Dec Revenue']]
+    df_score['Annual'] = [f"{v/1e6:.1f}M" for v in df_score['Annual']]
+    df_score['Margin'] = [f"{v:.1f}%" for v in df_score['Margin']]
     st.dataframe(df_score, use_container_width=True, hide_index=True)
 
 
@@ -821,6 +770,7 @@ elif page == "🚀 Growth & Expansion":
 # PAGE: RECOMMENDATIONS
 # ============================================================
 elif page == "🎯 Recommendations":
+    import plotly.express as px
     st.markdown("# 🎯 Strategic Recommendations")
     st.markdown("*5 prioritized actions to grow profitability, ordered by estimated impact*")
     
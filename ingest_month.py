@@ -0,0 +1,101 @@
+"""
+Month-end incremental ingest into the partitioned report store.
+
+    python ingest_month.py --init DATA_DIR              # seed the store from the full-year exports
+    python ingest_month.py 2026 February MONTH_DIR      # add / replace one month's exports
+
+MONTH_DIR holds the new month's exports under their usual file names; any of
+the monthly / product / group reports that are present are ingested. An item
+or group export whose header declares another period, or that overlaps one
+already stored (e.g. the full-year export again), is refused and nothing is
+written. The store lives in STORIES_STORE_DIR (or --store).
+"""
+
+import argparse
+import os
+import time
+
+from stories_io.parsers import MONTHS, report_paths
+from stories_io.store import store_dir_from_env, init_store, ingest_month, load_aggregates
+
+INGESTED_REPORTS = ('monthly', 'products', 'groups')
+
+
+def existing_sources(data_dir):
+    return {key: path for key, path in report_paths(data_dir).items()
+            if key in INGESTED_REPORTS and os.path.exists(path)}
+
+
+def parse_month(text):
+    if text.isdigit():
+        return MONTHS[int(text) - 1]
+    for m in MONTHS:
+        if m.lower().startswith(text.lower()):
+            return m
+    raise argparse.ArgumentTypeError(f'not a month: {text}')
+
+
+def print_aggregates(store_dir, year):
+    aggs = load_aggregates(store_dir)
+
+    if 'monthly_totals' in aggs:
+        print(f"\n--- Monthly Totals ({year}) ---")
+        totals = aggs['monthly_totals']
+        for _, row in totals[totals['Year'] == year].iterrows():
+            print(f"  {row['Month']:12s}: {row['Value']:>15,.0f}")
+
+    if 'df_prod_agg' in aggs:
+        print("\n--- Top 10 Products by Total Profit ---")
+        for _, row in aggs['df_prod_agg'].sort_values('Total Profit', ascending=False).head(10).iterrows():
+            print(f"  {row['Product']:40s}: Qty={row['Qty']:>8,.0f}  Profit={row['Total Profit']:>12,.0f}  Margin={row['Profit Margin']:.1f}%")
+
+    if 'df_group_summary' in aggs:
+        print("\n--- Top 10 Product Groups by Revenue ---")
+        for _, row in aggs['df_group_summary'].head(10).iterrows():
+            print(f"  {row['Group']:35s}: Qty={row['Qty']:>10,.0f}  Revenue={row['Total Amount']:>15,.0f}")
+
+    if 'jan_compare' in aggs:
+        jan = aggs['jan_compare']
+        print(f"\n--- YoY January Comparison: {len(jan)} branches, avg {jan['YoY Change %'].mean():+.1f}% ---")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument('year', nargs='?', type=int)
+    ap.add_argument('month', nargs='?', type=parse_month)
+    ap.add_argument('data_dir', nargs='?')
+    ap.add_argument('--init', metavar='DATA_DIR', help='seed an empty store from full-year exports')
+    ap.add_argument('--store', default=store_dir_from_env(), help='store directory')
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    if args.init:
+        sources = existing_sources(args.init)
+        try:
+            manifest = init_store(args.store, sources)
+        except FileExistsError as e:
+            ap.error(str(e))
+        print(f"Initialised {args.store} from {', '.join(sorted(sources))}: "
+              f"{len(manifest['monthly'])} monthly partitions")
+        year = max(int(k[:4]) for k in manifest['monthly']) if manifest['monthly'] else None
+    else:
+        if args.data_dir is None:
+            ap.error('year, month and data_dir are required without --init')
+        sources = existing_sources(args.data_dir)
+        if not sources:
+            ap.error(f'no exports found in {args.data_dir}')
+        try:
+            refreshed = ingest_month(args.store, args.year, args.month, sources)
+        except ValueError as e:
+            # An export of another period, or one already in the store
+            ap.error(str(e))
+        print(f"Ingested {args.month} {args.year} ({', '.join(sorted(sources))}); "
+              f"recomputed: {', '.join(refreshed) or 'nothing (unchanged)'}")
+        year = args.year
+    print(f"Done in {time.perf_counter() - t0:.2f}s")
+
+    print_aggregates(args.store, year)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Headless batch run: parse → analytics → charts → report_data.json → executive summary PDF.
+
+    python run_report.py DATA_DIR --out-dir OUT_DIR
+    python run_report.py tenants/a tenants/b tenants/c --out-dir out/    # -> out/a, out/b, out/c
+
+Everything happens in one process: the analysis frames go straight to the
+chart renderer, and the PDF's charts are drawn into memory at their size on
+the page from the same frames, without re-reading report_data.json or PNGs. With several data directories (one per tenant)
+the imports and the chart worker pool are paid for once for the whole batch.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from analysis import TIMINGS_NAME, analyze, write_outputs
+from charts import chart_workers, setup_style
+from exec_summary import build_summary, HAVE_SVGLIB
+from stories_io.instrument import Recorder, recording
+
+
+def tenant_out_dir(out_dir, data_dir, n_tenants):
+    if n_tenants == 1:
+        return out_dir
+    return os.path.join(out_dir, os.path.basename(os.path.normpath(data_dir)))
+
+
+def run_one(data_dir, out_dir, executor=None, pdf=True, workers=None, vector=False, trace_memory=False):
+    """Analysis, charts and PDF of one data directory; returns {step: seconds} and the chart failures.
+
+    The per-stage timings of the run are written to timings.json in `out_dir`.
+    """
+    timings = {}
+    recorder = Recorder(trace_memory=trace_memory)
+    with recording(recorder):
+        t0 = time.perf_counter()
+        result = analyze(data_dir)
+        timings['analysis'] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        charts = write_outputs(result, out_dir, executor=executor, workers=workers)
+        timings['charts'] = time.perf_counter() - t0
+        failures = [name for name, _, error in charts if error]
+
+        if pdf:
+            t0 = time.perf_counter()
+            build_summary(out_dir, result['chart_data'], vector=vector)
+            timings['pdf'] = time.perf_counter() - t0
+    recorder.write(os.path.join(out_dir, TIMINGS_NAME))
+    return timings, failures
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument('data_dirs', nargs='+', metavar='DATA_DIR', help='directory holding the four CSV exports')
+    ap.add_argument('--out-dir', required=True, help='output directory (one subdirectory per DATA_DIR when several)')
+    ap.add_argument('--no-pdf', action='store_true', help='skip the executive summary PDF')
+    ap.add_argument('--vector', action='store_true', help='embed the PDF charts as vector drawings (needs svglib)')
+    ap.add_argument('--workers', type=int, default=None, help='chart worker processes (default STORIES_CHART_WORKERS / CPU count)')
+    ap.add_argument('--trace-memory', action='store_true', help='record tracemalloc peaks in timings.json (slower)')
+    ap.add_argument('-q', '--quiet', action='store_true', help='only print the per-run timing lines')
+    args = ap.parse_args()
+    if args.vector and not HAVE_SVGLIB:
+        ap.error('--vector needs svglib (pip install svglib)')
+
+    workers = args.workers or chart_workers()
+    failed = 0
+    with contextlib.ExitStack() as stack:
+        executor = None
+        if workers > 1:
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=workers, initializer=setup_style))
+        else:
+            setup_style()
+        for data_dir in args.data_dirs:
+            out_dir = tenant_out_dir(args.out_dir, data_dir, len(args.data_dirs))
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()) if args.quiet else contextlib.nullcontext():
+                timings, failures = run_one(data_dir, out_dir, executor, pdf=not args.no_pdf,
+                                            workers=workers, vector=args.vector, trace_memory=args.trace_memory)
+            steps = '  '.join(f'{step} {secs:.2f}s' for step, secs in timings.items())
+            status = f'  {len(failures)} chart(s) failed: {", ".join(failures)}' if failures else ''
+            print(f"[{out_dir}] {time.perf_counter() - t0:.2f}s  ({steps}){status}")
+            failed += bool(failures)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
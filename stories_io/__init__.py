@@ -0,0 +1,41 @@
+"""
+Stories Coffee — shared POS export parsing
+
+The names below are imported from their submodule on first use, so importing
+a light submodule (e.g. stories_io.instrument) does not pull in pandas.
+"""
+
+import importlib
+
+_EXPORTS = {
+    'numeric': ['to_number', 'coerce_columns'],
+    'tokenizer': ['split_line', 'tokenize_lines'],
+    'parsers': [
+        'PARSER_VERSION', 'MONTHS', 'REPORT_FILES', 'normalize_branch',
+        'iter_monthly_sales', 'parse_monthly_sales_long', 'monthly_wide', 'parse_monthly_sales',
+        'parse_category_profit', 'parse_product_profit', 'parse_group_sales',
+        'report_paths', 'load_reports',
+    ],
+    'cache': ['file_digest', 'load_report_cached', 'load_reports_cached'],
+    'analytics': ['product_totals', 'group_totals', 'product_agg', 'group_summary'],
+    'store': ['init_store', 'ingest_month', 'load_store', 'load_aggregates'],
+    'cube': ['MonthlyCube', 'build_cube', 'monthly_totals', 'month_compare'],
+    'rollup': ['build_rollup', 'load_rollup_cached'],
+    'rowindex': ['RowIndex', 'build_row_index'],
+    'stream': ['iter_chunks', 'write_parts', 'iter_parts', 'read_parts'],
+    'parallel': ['parse_parallel'],
+}
+_SOURCE = {name: module for module, names in _EXPORTS.items() for name in names}
+__all__ = list(_SOURCE)
+
+
+def __getattr__(name):
+    if name not in _SOURCE:
+        raise AttributeError(f"module 'stories_io' has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'stories_io.{_SOURCE[name]}'), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
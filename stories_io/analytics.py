@@ -0,0 +1,42 @@
+"""
+Aggregates shared by analysis.py and the incremental store.
+
+Product and group summaries are plain sums, so they can be built from the
+full frames or updated one partition at a time (see stories_io.store) and
+still come out the same; the ratio columns are always derived afterwards.
+Sums are accumulated in float64 even where the row columns are float32.
+"""
+
+
+PRODUCT_SUMS = ['Qty', 'Total Cost', 'Total Profit', 'Revenue']
+GROUP_SUMS = ['Qty', 'Total Amount']
+
+
+def product_totals(df_products):
+    """Per-product sums of PRODUCT_SUMS across every branch, indexed by Product."""
+    values = df_products[PRODUCT_SUMS].astype('float64')
+    totals = values.groupby(df_products['Product'], observed=True).sum()
+    totals.index = totals.index.astype(str)
+    return totals
+
+
+def group_totals(df_groups):
+    """Per-group sums of GROUP_SUMS across every branch, indexed by Group."""
+    values = df_groups[GROUP_SUMS].astype('float64')
+    totals = values.groupby(df_groups['Group'], observed=True).sum()
+    totals.index = totals.index.astype(str)
+    return totals
+
+
+def product_agg(totals):
+    """df_prod_agg: product totals plus Profit Margin and Avg Price."""
+    df = totals.reset_index()
+    df['Profit Margin'] = df['Total Profit'] / df['Revenue'] * 100
+    df['Avg Price'] = df['Revenue'] / df['Qty']
+    return df
+
+
+def group_summary(totals):
+    """df_group_summary: group totals, largest revenue first."""
+    return totals.reset_index().sort_values('Total Amount', ascending=False)
+
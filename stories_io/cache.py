@@ -0,0 +1,106 @@
+"""
+On-disk cache of parsed report frames.
+
+Each parsed frame is stored as an uncompressed Arrow/Feather file named after
+the report, a SHA-256 digest of the source CSV and PARSER_VERSION. A later run
+over the same export memory-maps the columnar file instead of re-tokenizing
+the CSV; a changed export (or a parser change that bumps PARSER_VERSION)
+simply misses the cache and is parsed again.
+
+Sources are paths or the raw bytes of an upload; either way the cache key is
+the content digest, never the file name.
+
+Set STORIES_CACHE_DIR to move the cache, or to an empty string to disable it.
+Without pyarrow installed every call falls through to the parsers. Large item
+and group export files are parsed on a process pool (stories_io.parallel).
+"""
+
+import hashlib
+import io
+import os
+import tempfile
+
+from stories_io.parallel import parse_report
+from stories_io.parsers import PARSER_VERSION
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'stories_coffee')
+CHUNK_SIZE = 1 << 20
+
+
+def cache_dir_from_env():
+    return os.environ.get('STORIES_CACHE_DIR', DEFAULT_CACHE_DIR)
+
+
+def file_digest(source):
+    """SHA-256 hex digest of a source file's bytes."""
+    h = hashlib.sha256()
+    with open(source, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def source_digest(source):
+    """SHA-256 hex digest of a path's file or of raw bytes."""
+    if isinstance(source, (bytes, bytearray)):
+        return hashlib.sha256(source).hexdigest()
+    return file_digest(source)
+
+
+def parser_input(source):
+    """What the parsers read: a path as-is, bytes as a decoded text buffer."""
+    if isinstance(source, (bytes, bytearray)):
+        return io.StringIO(bytes(source).decode('utf-8-sig'))
+    return source
+
+
+def cache_path(cache_dir, report, digest):
+    return os.path.join(cache_dir, f'{report}-{digest[:32]}-v{PARSER_VERSION}.feather')
+
+
+def write_atomic(df, path):
+    """Write `df` as uncompressed Feather at `path` via a temp file and rename."""
+    # Write next to the target and rename, so a concurrent reader never sees
+    # a half-written file
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    try:
+        feather.write_feather(df, tmp, compression='uncompressed')
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def load_report_cached(report, source, cache_dir=None, digest=None):
+    """Parse one report (path or bytes), or memory-map its cached frame if the content is unchanged."""
+    cache_dir = cache_dir_from_env() if cache_dir is None else cache_dir
+    if not cache_dir or feather is None:
+        return parse_report(report, parser_input(source))
+
+    digest = digest or source_digest(source)
+    path = cache_path(cache_dir, report, digest)
+    if os.path.exists(path):
+        return feather.read_feather(path, memory_map=True)
+
+    df = parse_report(report, parser_input(source))
+    os.makedirs(cache_dir, exist_ok=True)
+    write_atomic(df, path)
+    return df
+
+
+def load_reports_cached(sources, cache_dir=None, digests=None):
+    """load_reports() with the on-disk cache in front of every parser.
+
+    `digests` (report key -> source_digest) saves re-hashing sources the
+    caller has already fingerprinted.
+    """
+    digests = digests or {}
+    return {key: load_report_cached(key, source, cache_dir, digests.get(key))
+            for key, source in sources.items()}
@@ -0,0 +1,220 @@
+"""
+Dense years x branches x 12 revenue cube for REP_S_00134.
+
+The wide monthly frame keeps one object-keyed row per (Year, Branch) with the
+month names as loose columns; every analysis used to re-slice it with lists of
+month names. The cube holds the same numbers as one float64 array plus
+year / branch index maps, so seasonality, YoY, first-active month and ramp-up
+curves are plain axis reductions. Months a branch has no row for are 0.
+
+`yoy` compares every month of every year pair in one pass, on single months,
+trailing 3-month sums or year-to-date sums (see WINDOWS).
+"""
+
+from collections import namedtuple
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from stories_io.parsers import MONTHS
+
+WINDOWS = ('month', 'rolling3', 'ytd')
+
+MonthlyCube = namedtuple('MonthlyCube', 'values totals present years branches year_index branch_index')
+MonthlyCube.__doc__ = """\
+values        float64 (years, branches, 12) monthly revenue
+totals        float64 (years, branches) 'Total By Year' as exported
+present       bool    (years, branches) the export has a row for that year and branch
+years         sorted list of years; year_index maps year -> axis 0 position
+branches      branch names in file order; branch_index maps branch -> axis 1 position
+"""
+
+
+def build_cube(df_monthly):
+    """MonthlyCube from the wide monthly frame (one row per Year, Branch)."""
+    years = sorted(df_monthly['Year'].unique().tolist())
+    branches = list(dict.fromkeys(df_monthly['Branch']))
+    year_index = {y: i for i, y in enumerate(years)}
+    branch_index = {b: i for i, b in enumerate(branches)}
+
+    yi = df_monthly['Year'].map(year_index).to_numpy()
+    bi = df_monthly['Branch'].map(branch_index).to_numpy()
+    months = df_monthly.reindex(columns=MONTHS).to_numpy(dtype='float64', na_value=0.0)
+
+    values = np.zeros((len(years), len(branches), len(MONTHS)))
+    values[yi, bi] = months
+    totals = np.zeros((len(years), len(branches)))
+    if 'Total By Year' in df_monthly.columns:
+        totals[yi, bi] = df_monthly['Total By Year'].to_numpy(dtype='float64', na_value=0.0)
+    else:
+        totals[yi, bi] = months.sum(axis=1)
+    present = np.zeros((len(years), len(branches)), dtype=bool)
+    present[yi, bi] = True
+    return MonthlyCube(values, totals, present, years, branches, year_index, branch_index)
+
+
+def year_values(cube, year):
+    """(branches, 12) slice of one year; zeros for a year the export does not cover."""
+    if year not in cube.year_index:
+        return np.zeros((len(cube.branches), len(MONTHS)))
+    return cube.values[cube.year_index[year]]
+
+
+def monthly_totals(cube, year):
+    """Chain-wide revenue per month of `year` as {month: total}."""
+    return dict(zip(MONTHS, year_values(cube, year).sum(axis=0)))
+
+
+def peak_trough(cube, year):
+    """(peak month, trough month) of the chain-wide monthly totals."""
+    totals = year_values(cube, year).sum(axis=0)
+    return MONTHS[int(totals.argmax())], MONTHS[int(totals.argmin())]
+
+
+def first_active(cube, year):
+    """First month index with sales per branch of `year`, -1 where it never sold."""
+    active = year_values(cube, year) > 0
+    return np.where(active.any(axis=1), active.argmax(axis=1), -1)
+
+
+def new_branches(cube, year):
+    """Branches whose first sales in `year` came after January, with that month."""
+    first = first_active(cube, year)
+    idx = np.flatnonzero(first > 0)
+    return pd.DataFrame({
+        'Branch': [cube.branches[i] for i in idx],
+        'First Month': [MONTHS[m] for m in first[idx]],
+    })
+
+
+def expansion_scorecard(cube, year, df_branch_totals):
+    """One row per new branch of `year`: opening month, December and annual revenue, margin and assessment.
+
+    Margins come from one join against the branch totals (0 where a branch
+    has no category row).
+    """
+    first = first_active(cube, year)
+    idx = np.flatnonzero(first > 0)
+    y = cube.year_index.get(year)
+    df = pd.DataFrame({
+        'Branch': [cube.branches[i] for i in idx],
+        'Opened': [MONTHS[m][:3] for m in first[idx]],
+        'Dec Revenue': year_values(cube, year)[idx, MONTHS.index('December')],
+        'Annual': cube.totals[y, idx] if y is not None else np.zeros(len(idx)),
+    })
+    margins = df_branch_totals.drop_duplicates('Branch').set_index('Branch')['Profit %']
+    df['Margin'] = df['Branch'].map(margins).fillna(0.0)
+    df['Assessment'] = np.select(
+        [df['Annual'] > 30000000, df['Annual'] > 15000000, df['Annual'] > 5000000],
+        ['🟢 Star', '🟡 Solid', '🔵 Early'],
+        default='⚪ Minimal',
+    )
+    return df.sort_values('Annual', ascending=False).reset_index(drop=True)
+
+
+def windowed(cube, window='month'):
+    """(years, branches, 12) revenue summed over `window` ending at each month.
+
+    A window is NaN unless every month it covers was reported chain-wide, so
+    months not exported yet and windows reaching before the first year drop
+    out instead of comparing as partial sums. Rolling windows run across year
+    boundaries; years missing between cube.years count as unreported.
+    """
+    if window not in WINDOWS:
+        raise ValueError(f'unknown window {window!r}, expected one of {WINDOWS}')
+    first = cube.years[0]
+    pos = [y - first for y in cube.years]
+    dense = np.zeros((cube.years[-1] - first + 1, len(cube.branches), len(MONTHS)))
+    dense[pos] = cube.values
+    reported = dense.sum(axis=1) > 0
+
+    if window == 'month':
+        out, ok = dense, reported
+    elif window == 'ytd':
+        out, ok = dense.cumsum(axis=2), np.logical_and.accumulate(reported, axis=1)
+    else:
+        # Flatten (year, month) into one timeline per branch
+        flat = dense.transpose(1, 0, 2).reshape(len(cube.branches), -1)
+        roll = np.zeros_like(flat)
+        roll[:, 2:] = flat[:, 2:] + flat[:, 1:-1] + flat[:, :-2]
+        out = roll.reshape(len(cube.branches), -1, len(MONTHS)).transpose(1, 0, 2)
+        rep = reported.reshape(-1)
+        ok = np.zeros_like(rep)
+        ok[2:] = rep[2:] & rep[1:-1] & rep[:-2]
+        ok = ok.reshape(reported.shape)
+    return np.where(ok[:, None, :], out, np.nan)[pos]
+
+
+def yoy(cube, window='month', pairs=None):
+    """Long YoY table for every (prev year, year) pair, branch and month.
+
+    `pairs` defaults to every pair of cube years. Rows exist where the branch
+    sold in both windows; columns are Branch, Month, Prev Year, Year, Prev,
+    Curr and YoY Change %, ordered by pair, branch (file order) and month.
+    """
+    if pairs is None:
+        pairs = list(combinations(cube.years, 2))
+    w = windowed(cube, window)
+    prev = w[[cube.year_index[a] for a, _ in pairs]]
+    curr = w[[cube.year_index[b] for _, b in pairs]]
+    keep = (prev > 0) & (curr > 0)
+    pi, bi, mi = np.nonzero(keep)
+    df = pd.DataFrame({
+        'Branch': np.asarray(cube.branches, dtype=object)[bi],
+        'Month': np.asarray(MONTHS, dtype=object)[mi],
+        'Prev Year': np.array([a for a, _ in pairs], dtype='int64')[pi],
+        'Year': np.array([b for _, b in pairs], dtype='int64')[pi],
+        'Prev': prev[keep],
+        'Curr': curr[keep],
+    })
+    df['YoY Change %'] = (df['Curr'] - df['Prev']) / df['Prev'] * 100
+    return df
+
+
+def yoy_summary(table):
+    """Per (year pair, month) of a `yoy` table: branches compared, mean branch YoY and like-for-like chain YoY."""
+    g = table.assign(_m=table['Month'].map(MONTHS.index)).groupby(['Prev Year', 'Year', '_m', 'Month'])
+    df = g.agg(Branches=('Branch', 'size'), Prev=('Prev', 'sum'), Curr=('Curr', 'sum'),
+               **{'Avg YoY %': ('YoY Change %', 'mean')}).reset_index().drop(columns='_m')
+    df['Chain YoY %'] = (df['Curr'] - df['Prev']) / df['Prev'] * 100
+    return df
+
+
+def yoy_matrix(table, prev_year, curr_year, value='YoY Change %'):
+    """Branch x month pivot of one year pair of a `yoy` table (NaN where not comparable)."""
+    pair = table[(table['Prev Year'] == prev_year) & (table['Year'] == curr_year)]
+    branches = list(dict.fromkeys(pair['Branch']))
+    return pair.pivot(index='Branch', columns='Month', values=value).reindex(index=branches, columns=MONTHS)
+
+
+def month_compare(cube, prev_year=None, curr_year=None, month='January'):
+    """Branches with sales in `month` of both years and their YoY change.
+
+    The years default to the cube's two latest. Columns are Branch, e.g.
+    Jan_2025 / Jan_2026 and YoY Change %, largest change first; the frame is
+    empty when the export lacks either year.
+    """
+    if prev_year is None or curr_year is None:
+        latest = cube.years[-1] if cube.years else 0
+        prev_year, curr_year = cube.years[-2] if len(cube.years) > 1 else latest - 1, latest
+    a_col, b_col = f'{month[:3]}_{prev_year}', f'{month[:3]}_{curr_year}'
+    if prev_year not in cube.year_index or curr_year not in cube.year_index:
+        return pd.DataFrame(columns=['Branch', a_col, b_col, 'YoY Change %'])
+    table = yoy(cube, pairs=[(prev_year, curr_year)])
+    df = (table[table['Month'] == month]
+          .rename(columns={'Prev': a_col, 'Curr': b_col})[['Branch', a_col, b_col, 'YoY Change %']]
+          .reset_index(drop=True))
+    return df.sort_values('YoY Change %', ascending=False)
+
+
+def ramp_up(cube, year, branches):
+    """{branch: 12 monthly values} for the `branches` of `year` that sold at all."""
+    values = year_values(cube, year)
+    curves = {}
+    for branch in branches:
+        i = cube.branch_index.get(branch)
+        # A year the export lacks is all zeros, so it never reaches the year_index lookup
+        if i is not None and values[i].max() > 0 and cube.present[cube.year_index[year], i]:
+            curves[branch] = values[i]
+    return curves
@@ -0,0 +1,32 @@
+"""
+Compact column dtypes for the per-product frames.
+
+The item and group reports repeat a handful of branch / service / category /
+section / group names on every one of their ~12k rows, so those columns are
+stored as pandas categoricals. Quantities and percentages are downcast to
+float32. Money columns stay float64: chain-wide revenue runs to ~1e9 and is
+summed across every row, which is beyond what float32 can hold to the cent.
+
+Group on these columns with `observed=True` so only categories that actually
+occur in the (possibly filtered) frame show up in the result.
+"""
+
+PRODUCT_CATEGORICALS = ['Branch', 'Service', 'Category', 'Section', 'Product']
+PRODUCT_FLOAT32 = ['Qty', 'Cost %', 'Profit %']
+
+GROUP_CATEGORICALS = ['Branch', 'Division', 'Group', 'Product']
+GROUP_FLOAT32 = ['Qty']
+
+
+def compact(frame, categoricals, float32):
+    """Convert `categoricals` to category dtype and `float32` columns to float32, in place."""
+    for col in categoricals:
+        frame[col] = frame[col].astype('category')
+    for col in float32:
+        frame[col] = frame[col].astype('float32')
+    return frame
+
+
+def memory_mb(frame):
+    """Deep memory footprint of a frame in megabytes."""
+    return frame.memory_usage(deep=True).sum() / 1e6
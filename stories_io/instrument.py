@@ -0,0 +1,215 @@
+"""
+Per-stage timing and memory instrumentation for the batch pipeline.
+
+    rec = Recorder(trace_memory=True, profile_dir='prof/')
+    with recording(rec):
+        with stage('parse.products') as st:
+            df = parse(...)
+            st.rows_out = len(df)
+    rec.write('timings.json')
+
+A stage records wall and CPU time, the rows in / out its caller sets and,
+with `trace_memory`, the tracemalloc peak above the memory traced when it
+started. Stages nest; the records stay flat in start order with their parent
+and depth. With `profile_dir` every top-level stage also runs under cProfile
+and is dumped to <profile_dir>/<nn>_<stage>.prof (only one profiler can be
+active, so nested stages show up inside their top-level stage's dump).
+
+`stage` / `timed` record into the recorder made active by `recording`; with
+none active they do nothing, so library code can be instrumented for free.
+Work done in pool workers is recorded there with `remote_stage` and handed
+back to the parent with `Recorder.adopt`.
+"""
+
+import cProfile
+import datetime
+import functools
+import json
+import os
+import platform
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+STAGE_FIELDS = ['name', 'parent', 'depth', 'start_s', 'wall_s', 'cpu_s', 'rows_in', 'rows_out', 'peak_mb', 'profile']
+
+
+class Stage:
+    """One stage's record; set rows_in / rows_out inside the `with` block."""
+
+    __slots__ = STAGE_FIELDS + ['_base', '_peak']
+
+    def __init__(self, name, parent=None, depth=0, rows_in=None):
+        self.name, self.parent, self.depth, self.rows_in = name, parent, depth, rows_in
+        self.start_s = self.wall_s = self.cpu_s = self.rows_out = self.peak_mb = self.profile = None
+        self._base = self._peak = 0
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in STAGE_FIELDS}
+
+
+class Recorder:
+    """Collects Stage records for one run (see module docstring)."""
+
+    enabled = True
+
+    def __init__(self, trace_memory=False, profile_dir=None):
+        self.trace_memory, self.profile_dir = trace_memory, profile_dir
+        self.stages = []
+        self.started = datetime.datetime.now().isoformat(timespec='seconds')
+        self._stack = []
+        self._t0, self._c0 = time.perf_counter(), time.process_time()
+        self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        parent = self._stack[-1] if self._stack else None
+        st = Stage(name, parent.name if parent else None, len(self._stack), rows_in)
+        st.start_s = time.perf_counter() - self._t0
+        self.stages.append(st)
+        number = len(self.stages)
+
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            # Resetting the peak for this stage hides it from the enclosing one; hand it up first
+            if parent is not None:
+                parent._peak = max(parent._peak, peak)
+            tracemalloc.reset_peak()
+            st._base = current
+        profiler = cProfile.Profile() if self.profile_dir and parent is None else None
+
+        self._stack.append(st)
+        t0, c0 = time.perf_counter(), time.process_time()
+        if profiler:
+            profiler.enable()
+        try:
+            yield st
+        finally:
+            if profiler:
+                profiler.disable()
+            st.wall_s = time.perf_counter() - t0
+            st.cpu_s = time.process_time() - c0
+            self._stack.pop()
+            if self.trace_memory:
+                st._peak = max(st._peak, tracemalloc.get_traced_memory()[1])
+                st.peak_mb = (st._peak - st._base) / 2**20
+            if profiler:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                slug = re.sub(r'[^\w.-]+', '_', name)
+                st.profile = os.path.join(self.profile_dir, f'{number:02d}_{slug}.prof')
+                profiler.dump_stats(st.profile)
+
+    def adopt(self, records):
+        """Add stage records made in another process (see remote_stage) under the current stage."""
+        parent = self._stack[-1] if self._stack else None
+        for record in records:
+            st = Stage(record['name'])
+            for field in STAGE_FIELDS:
+                setattr(st, field, record[field])
+            st.parent = record['parent'] or (parent.name if parent else None)
+            st.depth = record['depth'] + len(self._stack)
+            st.start_s = None  # offsets of another process's clock mean nothing here
+            self.stages.append(st)
+
+    def stop(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def report(self):
+        """The timing report as a JSON-ready dict."""
+        return {
+            'started': self.started,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'trace_memory': self.trace_memory,
+            'total': {
+                'wall_s': time.perf_counter() - self._t0,
+                'cpu_s': time.process_time() - self._c0,  # this process only, not pool workers
+                'staged_wall_s': sum(st.wall_s or 0 for st in self.stages if st.depth == 0),
+            },
+            'stages': [st.as_dict() for st in self.stages],
+        }
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+
+class _NullRecorder:
+    enabled = False
+    trace_memory = False
+
+    def stage(self, name, rows_in=None):
+        return nullcontext(Stage(name, rows_in=rows_in))
+
+    def adopt(self, records):
+        pass
+
+
+NULL = _NullRecorder()
+_active = NULL
+
+
+def active():
+    """The recorder `stage` / `timed` record into (NULL when none is active)."""
+    return _active
+
+
+@contextmanager
+def recording(recorder):
+    """Make `recorder` the active one for the duration of the block."""
+    global _active
+    previous, _active = _active, recorder
+    try:
+        yield recorder
+    finally:
+        _active = previous
+        recorder.stop()
+
+
+def stage(name, rows_in=None):
+    """Context manager recording one stage into the active recorder."""
+    return _active.stage(name, rows_in)
+
+
+def timed(name=None, rows_out=None):
+    """Decorator: record every call as stage `name` (default: the function's name).
+
+    `rows_out`, if given, is applied to the return value to count its rows
+    (e.g. len).
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _active.stage(name or fn.__name__) as st:
+                result = fn(*args, **kwargs)
+                if rows_out is not None:
+                    st.rows_out = rows_out(result)
+                return result
+        return wrapper
+    return decorate
+
+
+def remote_stage(name, fn, *args, trace_memory=False):
+    """Run fn(*args) as stage `name` under a fresh recorder, e.g. in a pool worker.
+
+    Returns (result, stage records) for the parent's Recorder.adopt.
+    """
+    recorder = Recorder(trace_memory=trace_memory)
+    with recording(recorder):
+        with recorder.stage(name):
+            result = fn(*args)
+    return result, [st.as_dict() for st in recorder.stages]
+
+
+def file_lines(path):
+    """Line count of a source file, the rows_in of its parse stage."""
+    with open(path, 'rb') as f:
+        return sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 20), b''))
@@ -0,0 +1,31 @@
+"""
+Bulk numeric coercion for POS export columns.
+
+The exports write numbers as text with thousands separators ("1,234.50") and
+leave blanks where there is no value. Whole columns are converted at once with
+the same rule the old per-cell `parse_num` applied: anything that is missing
+or does not parse as a number becomes 0.0.
+"""
+
+import pandas as pd
+
+
+def parse_numbers(values):
+    """Convert a column of export text to float64, NaN where a cell is blank or not a number."""
+    col = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    if pd.api.types.is_numeric_dtype(col.dtype):
+        return col.astype('float64')
+    text = col.astype('str').str.replace(',', '', regex=False).str.strip()
+    return pd.to_numeric(text, errors='coerce').astype('float64')
+
+
+def to_number(values):
+    """Convert a column of export text to float64, mapping bad cells to 0.0."""
+    return parse_numbers(values).fillna(0.0)
+
+
+def coerce_columns(frame, columns):
+    """Convert `columns` of `frame` to float64 in place and return the frame."""
+    for col in columns:
+        frame[col] = to_number(frame[col])
+    return frame
@@ -0,0 +1,130 @@
+"""
+Multi-process parsing of the item and group exports, split at branch headers.
+
+Every `Stories ...` row of rep_s_00014 and `Branch: ...` row of rep_s_00191
+opens an independent block. `parse_parallel` finds their byte offsets with
+a memchr-speed scan of the memory-mapped file, cuts the file into contiguous
+byte ranges of whole branches (a few per worker, balanced by size) and has a
+process pool run the usual vectorized rows builder over each range. The
+frames are stitched back in file order: a range starts at its own branch
+header, and a lower level it uses before its own header (a service, category
+or section continuing across the branch row) is filled from where the
+previous range ended, so the result is the whole-file parser's frame exactly.
+
+A header the scan misses only makes a range bigger; a match that is not a
+header only cuts at a line start, which the stitching makes harmless.
+"""
+
+import bisect
+import io
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import pandas as pd
+
+from stories_io.dtypes import compact
+from stories_io.parsers import PARSERS, ROW_BUILDERS, normalize_branch
+from stories_io.reader import read_report_frame
+
+# report -> (what a branch header line starts with, the whole header-row pattern)
+BRANCH_HEADERS = {
+    'products': (b'Stories', re.compile(rb'Stories[^,\r\n]*,[,\r\n]')),
+    'groups': (b'Branch:', re.compile(rb'Branch:')),
+}
+# Below this a pool costs more than it saves
+MIN_PARALLEL_BYTES = 16 << 20
+# Ranges per worker: some slack for uneven branches, few enough that the
+# ~15 ms fixed cost per range stays small
+TASKS_PER_WORKER = 2
+
+
+def parse_workers():
+    """Pool size: STORIES_PARSE_WORKERS, else the CPU count."""
+    return int(os.environ.get('STORIES_PARSE_WORKERS', 0)) or os.cpu_count() or 1
+
+
+def branch_offsets(report, path):
+    """Byte offsets of the branch header rows of an export file (after its first line)."""
+    prefix, header = BRANCH_HEADERS[report]
+    needle = b'\n' + prefix
+    offsets = []
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return offsets
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # find() skips to the next candidate at memchr speed; a regex
+            # over every line start is ~10x slower
+            pos = mm.find(needle)
+            while pos != -1:
+                if header.match(mm, pos + 1):
+                    offsets.append(pos + 1)
+                pos = mm.find(needle, pos + 1)
+    return offsets
+
+
+def split_ranges(offsets, size, parts):
+    """Cut [0, size) at the `offsets` closest to `parts` equal shares; returns [(start, end)]."""
+    cuts = {0}
+    for k in range(1, parts):
+        i = bisect.bisect_left(offsets, k * size / parts)
+        near = [o for o in offsets[max(i - 1, 0):i + 1] if 0 < o < size]
+        if near:
+            cuts.add(min(near, key=lambda o: abs(o - k * size / parts)))
+    cuts = sorted(cuts) + [size]
+    return list(zip(cuts[:-1], cuts[1:]))
+
+
+def _parse_range(report, path, start, end):
+    """Runs in a worker: the rows builder over bytes [start, end) of the file."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = io.BytesIO(f.read(end - start))
+    build, width, _ = ROW_BUILDERS[report]
+    return build(read_report_frame(data, width))
+
+
+def _stitch(results):
+    """Concatenate range frames in order, filling each one's leading levels from the range before."""
+    frames, carry = [], {}
+    for df, levels in results:
+        for level, value in carry.items():
+            if value is not None and df[level].isna().any():
+                df[level] = df[level].fillna(normalize_branch(value) if level == 'Branch' else value)
+        carry = {level: value if value is not None else carry.get(level) for level, value in levels.items()}
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def parse_parallel(report, path, workers=None, executor=None):
+    """parse_product_profit / parse_group_sales of export file `path` on a process pool.
+
+    Falls back to the serial parser for one worker, a file under
+    MIN_PARALLEL_BYTES or a single branch block. Pass a long-lived `executor`
+    to reuse its workers across files.
+    """
+    workers = parse_workers() if workers is None else workers
+    size = os.path.getsize(path)
+    if executor is None and (workers <= 1 or size < MIN_PARALLEL_BYTES):
+        return PARSERS[report](path)
+    ranges = split_ranges(branch_offsets(report, path), size, workers * TASKS_PER_WORKER)
+    if len(ranges) <= 1:
+        return PARSERS[report](path)
+
+    starts, ends = zip(*ranges)
+    args = (_parse_range, repeat(report), repeat(path), starts, ends)
+    if executor is not None:
+        results = list(executor.map(*args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(*args))
+    return compact(_stitch(results), *ROW_BUILDERS[report][2])
+
+
+def parse_report(report, source):
+    """PARSERS[report](source), with item / group export files parsed by parse_parallel."""
+    if report in BRANCH_HEADERS and isinstance(source, (str, os.PathLike)):
+        return parse_parallel(report, source)
+    return PARSERS[report](source)
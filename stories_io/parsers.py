@@ -0,0 +1,359 @@
+"""
+One parser per POS report type.
+
+    REP_S_00134  monthly sales by branch (comparative, multi-year)
+    rep_s_00014  theoretical profit by item (product profitability)
+    rep_s_00191  sales by items by group
+    rep_s_00673  theoretical profit by category
+
+Every parser takes a path or an open file and returns a DataFrame; nothing
+here imports matplotlib or streamlit, so the batch script, the dashboard and
+the PDF generator all share the same code path.
+
+The three hierarchical reports are parsed by `*_rows` builders over a string
+frame of export lines, which take and return the hierarchy levels still open
+at the frame's edges, so stories_io.stream can feed them a file page range by
+page range.
+"""
+
+import os
+import re
+import warnings
+
+import pandas as pd
+
+from stories_io.dtypes import (
+    compact, PRODUCT_CATEGORICALS, PRODUCT_FLOAT32, GROUP_CATEGORICALS, GROUP_FLOAT32,
+)
+from stories_io.numeric import parse_numbers, to_number, coerce_columns
+from stories_io.reader import (
+    read_report_frame, contains_any, fill_level, last_level,
+    PRODUCT_PROFIT_WIDTH, GROUP_SALES_WIDTH, SERVICES, CATEGORIES, SECTIONS,
+)
+from stories_io.tokenizer import tokenize_lines
+
+# Bump whenever a parser's output changes, so cached frames are rebuilt
+PARSER_VERSION = 3
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June',
+          'July', 'August', 'September', 'October', 'November', 'December']
+
+REPORT_FILES = {
+    'monthly': 'REP_S_00134_SMRY.csv',
+    'products': 'rep_s_00014_SMRY.csv',
+    'groups': 'rep_s_00191_SMRY-3.csv',
+    'category': 'rep_s_00673_SMRY.csv',
+}
+
+CATEGORY_COLUMNS = ['Branch', 'Category', 'Qty', 'Total Price (Raw)', 'Revenue',
+                    'Total Cost', 'Cost %', 'Total Profit', 'Profit %']
+
+
+# ============================================================
+# UTILITY: Branch name normalization
+# ============================================================
+BRANCH_FIXES = {
+    'Alay': 'Aley',
+    'Stories.': 'Closed/Temp',
+    '.': 'Closed/Temp',
+    '': 'Closed/Temp',
+    'Lau': 'LAU',
+}
+
+
+def normalize_branch(name):
+    if pd.isna(name):
+        return name
+    name = str(name).strip()
+    # Remove "Stories" prefix variants, then title case
+    name = re.sub(r'^Stories\s*[-]?\s*', '', name, flags=re.IGNORECASE).strip().title()
+    return BRANCH_FIXES.get(name, name)
+
+
+def _normalize_column(branch):
+    """normalize_branch over a column, calling it once per distinct name."""
+    names = {b: normalize_branch(b) for b in branch.dropna().unique()}
+    return branch.map(names)
+
+
+def _open_text(source):
+    if hasattr(source, 'read'):
+        return source
+    return open(source, 'r', encoding='utf-8-sig')
+
+
+# ============================================================
+# REP_S_00134: Monthly Sales
+# ============================================================
+def iter_monthly_sales(source):
+    """Stream (year, branch, month, value text) tuples from REP_S_00134 in one pass."""
+    current_year = None
+    section_months = None  # which months the current columns represent
+
+    with _open_text(source) as f:
+        for line, parts in tokenize_lines(f):
+            # Skip non-data rows
+            if 'Page ' in line:
+                continue
+            if line.startswith('Stories,,,') or 'Comparative' in line:
+                continue
+
+            # Detect column headers
+            if 'January' in line or 'October' in line:
+                if 'Total By Year' in line:
+                    section_months = ['October', 'November', 'December', 'Total By Year']
+                elif 'January' in line:
+                    section_months = MONTHS[:9]
+                continue
+
+            # Detect year
+            if len(parts[0]) == 4 and parts[0].isdigit():
+                current_year = int(parts[0])
+                # A year row with no branch cells
+                if len(parts) < 2:
+                    continue
+            elif parts[0] != '' or len(parts) < 2:
+                continue
+
+            branch_name = parts[1]
+            if not branch_name or branch_name == 'Total':
+                continue
+
+            branch = normalize_branch(branch_name)
+
+            if section_months is None:
+                section_months = MONTHS[:9]
+
+            # Non-empty cells line up with the section's months; values stay
+            # as export text and are converted in bulk by the caller
+            vals = [p for p in parts[2:] if p and p != 'Total By Year']
+
+            for month, value in zip(section_months, vals):
+                yield current_year, branch, month, value
+
+
+def parse_monthly_sales_long(source):
+    """REP_S_00134 as a long (Year, Branch, Month, Value) frame.
+
+    A cell that is not a number is dropped like a blank one (that month has
+    no value for the branch) with a warning, rather than read as 0.0.
+    """
+    df = pd.DataFrame.from_records(iter_monthly_sales(source),
+                                   columns=['Year', 'Branch', 'Month', 'Value'])
+    values = parse_numbers(df['Value'])
+    bad = values.isna()
+    if bad.any():
+        cells = ', '.join(f"{r.Year} {r.Branch} {r.Month}: {r.Value!r}" for r in df[bad].head(5).itertuples())
+        warnings.warn(f'REP_S_00134: dropped {int(bad.sum())} cell(s) that are not numbers ({cells})')
+    df = df.assign(Value=values)[~bad]
+    return df.drop_duplicates(['Year', 'Branch', 'Month'], keep='last').reset_index(drop=True)
+
+
+def monthly_wide(df_long):
+    """One row per (Year, Branch) in file order, month names (+ Total By Year) as columns."""
+    row_keys = pd.MultiIndex.from_frame(df_long[['Year', 'Branch']].drop_duplicates())
+    present = set(df_long['Month'])
+    month_keys = [m for m in MONTHS + ['Total By Year'] if m in present]
+    df = (df_long.pivot(index=['Year', 'Branch'], columns='Month', values='Value')
+          .reindex(index=row_keys, columns=month_keys)
+          .reset_index())
+    df.columns.name = None
+    return df
+
+
+def parse_monthly_sales(source):
+    return monthly_wide(parse_monthly_sales_long(source))
+
+
+# ============================================================
+# rep_s_00673: Category Profit Summary
+# ============================================================
+def parse_category_profit(source):
+    """One row per branch x (BEVERAGES, FOOD, TOTAL)."""
+    return category_rows(read_report_frame(source, PRODUCT_PROFIT_WIDTH))[0]
+
+
+def category_rows(raw, levels=None):
+    """parse_category_profit over a string frame; returns (frame, levels open at its end)."""
+    levels = levels or {}
+    name = raw[0]
+
+    skip = (contains_any(raw, 'Page ') | contains_any(raw, 'Theoretical')
+            | contains_any(raw, 'Copyright') | contains_any(raw, 'REP_S')
+            | (name == 'Category').to_numpy())
+    is_branch = ~skip & (name.str.startswith('Stories') & (raw[1] == '')).to_numpy()
+    is_category = name.isin(CATEGORIES).to_numpy()
+    is_total = name.str.startswith('Total By Branch').to_numpy()
+    keep = ~skip & ~is_branch & (is_category | is_total)
+
+    branch = fill_level(name, is_branch, levels.get('Branch'))
+    df = pd.DataFrame({
+        'Branch': _normalize_column(branch),
+        'Category': name.where(is_category, 'TOTAL'),
+        'Qty': raw[1],
+        'Total Price (Raw)': raw[2],
+        'Total Cost': raw[4],
+        'Cost %': raw[5],
+        'Total Profit': raw[6],
+        'Profit %': raw[8],
+    })[keep].reset_index(drop=True)
+    coerce_columns(df, ['Qty', 'Total Price (Raw)', 'Total Cost', 'Cost %', 'Total Profit', 'Profit %'])
+    # Total Price is truncated in the export: Cost + Profit is the true revenue
+    df['Revenue'] = df['Total Cost'] + df['Total Profit']
+    return df[CATEGORY_COLUMNS], {'Branch': last_level(branch, levels.get('Branch'))}
+
+
+# ============================================================
+# rep_s_00014: Product Profitability
+# ============================================================
+def parse_product_profit(source, compact_dtypes=True):
+    """One row per product line with its Branch / Service / Category / Section.
+
+    Hierarchy columns come back as categoricals and Qty / percentages as
+    float32 unless `compact_dtypes` is False (see stories_io.dtypes).
+    """
+    df, _ = product_rows(read_report_frame(source, PRODUCT_PROFIT_WIDTH))
+    if compact_dtypes:
+        compact(df, PRODUCT_CATEGORICALS, PRODUCT_FLOAT32)
+    return df
+
+
+PRODUCT_LEVELS = ['Branch', 'Service', 'Category', 'Section']
+
+
+def product_rows(raw, levels=None):
+    """parse_product_profit (not compacted) over a string frame; returns (frame, levels open at its end)."""
+    levels = levels or {}
+    name = raw[0]
+
+    skip = (contains_any(raw, 'Page ') | contains_any(raw, 'Theoretical')
+            | contains_any(raw, 'Copyright') | contains_any(raw, 'REP_S')
+            | (name == 'Product Desc').to_numpy())
+    rest = ~skip
+
+    is_branch = rest & (name.str.startswith('Stories') & (raw[1] == '')).to_numpy()
+    rest &= ~is_branch
+    is_service = rest & name.isin(SERVICES).to_numpy()
+    rest &= ~is_service
+    is_category = rest & name.isin(CATEGORIES).to_numpy()
+    rest &= ~is_category
+    is_section = rest & (name.str.contains('SECTION', regex=False) | name.isin(SECTIONS)).to_numpy()
+    rest &= ~is_section
+    is_subtotal = rest & (name.str.startswith('Total By') | name.str.startswith('Total:')).to_numpy()
+    rest &= ~is_subtotal
+
+    qty = to_number(raw[1])
+    total_cost = to_number(raw[4])
+    total_profit = to_number(raw[6])
+    keep = rest & (qty > 0).to_numpy()
+
+    filled = {level: fill_level(name, mask, levels.get(level)) for level, mask in
+              zip(PRODUCT_LEVELS, [is_branch, is_service, is_category, is_section])}
+    df = pd.DataFrame({
+        'Branch': _normalize_column(filled['Branch']),
+        'Service': filled['Service'],
+        'Category': filled['Category'],
+        'Section': filled['Section'],
+        'Product': name,
+        'Qty': qty,
+        'Total Price': to_number(raw[2]),
+        'Total Cost': total_cost,
+        'Cost %': to_number(raw[5]),
+        'Total Profit': total_profit,
+        'Profit %': to_number(raw[8]),
+        'Revenue': total_cost + total_profit,  # True revenue
+    })[keep].reset_index(drop=True)
+    return df, {level: last_level(col, levels.get(level)) for level, col in filled.items()}
+
+
+# ============================================================
+# rep_s_00191: Sales by Groups
+# ============================================================
+def parse_group_sales(source, compact_dtypes=True):
+    """One row per product line with its Branch / Division / Group (compacted like products)."""
+    df, _ = group_rows(read_report_frame(source, GROUP_SALES_WIDTH))
+    if compact_dtypes:
+        compact(df, GROUP_CATEGORICALS, GROUP_FLOAT32)
+    return df
+
+
+GROUP_LEVELS = ['Branch', 'Division', 'Group']
+
+
+def group_rows(raw, levels=None):
+    """parse_group_sales (not compacted) over a string frame; returns (frame, levels open at its end)."""
+    levels = levels or {}
+    name = raw[0]
+
+    skip = (contains_any(raw, 'Page ') | contains_any(raw, 'Sales by Items')
+            | contains_any(raw, 'Copyright') | (name == 'Description').to_numpy())
+    rest = ~skip
+
+    is_branch = rest & name.str.startswith('Branch:').to_numpy()
+    rest &= ~is_branch
+    is_division = rest & name.str.startswith('Division:').to_numpy()
+    rest &= ~is_division
+    is_group = rest & name.str.startswith('Group:').to_numpy()
+    rest &= ~is_group
+    is_subtotal = rest & name.str.startswith('Total by').to_numpy()
+    rest &= ~is_subtotal
+
+    label = name.str.replace(r'^\w+:', '', regex=True).str.strip()
+    qty = to_number(raw[2])
+    keep = rest & (qty > 0).to_numpy()
+
+    filled = {level: fill_level(label, mask, levels.get(level)) for level, mask in
+              zip(GROUP_LEVELS, [is_branch, is_division, is_group])}
+    df = pd.DataFrame({
+        'Branch': _normalize_column(filled['Branch']),
+        'Division': filled['Division'],
+        'Group': filled['Group'],
+        'Product': name,
+        'Qty': qty,
+        'Total Amount': to_number(raw[3]),
+    })[keep].reset_index(drop=True)
+    return df, {level: last_level(col, levels.get(level)) for level, col in filled.items()}
+
+
+# ============================================================
+# ALL REPORTS
+# ============================================================
+PARSERS = {
+    'monthly': parse_monthly_sales,
+    'products': parse_product_profit,
+    'groups': parse_group_sales,
+    'category': parse_category_profit,
+}
+
+# report -> (rows builder, string frame width, compact dtypes) for the hierarchical reports
+ROW_BUILDERS = {
+    'products': (product_rows, PRODUCT_PROFIT_WIDTH, (PRODUCT_CATEGORICALS, PRODUCT_FLOAT32)),
+    'groups': (group_rows, GROUP_SALES_WIDTH, (GROUP_CATEGORICALS, GROUP_FLOAT32)),
+    'category': (category_rows, PRODUCT_PROFIT_WIDTH, None),
+}
+
+
+EXPORT_PERIOD = re.compile(r'Years?:\s*(\d{4})\s+Months?:\s*(\d+)')
+
+
+def export_period(path, max_lines=20):
+    """(year, month number) an item / group / category export declares in its page header.
+
+    Month 0 means the whole year; None if the header is not found.
+    """
+    with _open_text(path) as f:
+        for _, line in zip(range(max_lines), f):
+            match = EXPORT_PERIOD.search(line)
+            if match:
+                return int(match.group(1)), int(match.group(2))
+    return None
+
+
+def report_paths(data_dir):
+    """Default file locations of the four exports inside `data_dir`."""
+    return {key: os.path.join(data_dir, fname) for key, fname in REPORT_FILES.items()}
+
+
+def load_reports(sources):
+    """Parse every report in `sources` (report key -> path or file) into a dict of frames."""
+    return {key: PARSERS[key](source) for key, source in sources.items()}
@@ -0,0 +1,55 @@
+"""
+Vectorized building blocks for the hierarchical POS reports.
+
+The item, group and category reports are flat CSVs where branch / service /
+category / section rows set the context for the rows below them. Instead of
+walking the file with `current_*` state, the whole report is loaded as one
+string frame, every row kind is classified with a boolean mask, the hierarchy
+columns are forward-filled and all non-data rows are dropped in bulk (see
+stories_io.parsers).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# The POS exporter pads every row to the full column count; read a few spare
+# columns so a stray trailing comma never trips the C parser.
+PRODUCT_PROFIT_WIDTH = 12
+GROUP_SALES_WIDTH = 8
+
+SERVICES = ['TAKE AWAY', 'TABLE']
+CATEGORIES = ['BEVERAGES', 'FOOD']
+SECTIONS = ['HOT BAR SECTION', 'COLD BAR SECTION', 'DONUTS', 'FOOD SECTION', 'GRAB AND GO']
+
+
+def read_report_frame(source, width):
+    """Load a whole export as a string frame with integer column labels."""
+    frame = pd.read_csv(
+        source, header=None, names=range(width), dtype=str,
+        keep_default_na=False, skip_blank_lines=True, encoding='utf-8-sig',
+    )
+    return frame.apply(lambda col: col.str.strip())
+
+
+def contains_any(frame, text):
+    """Row mask: `text` appears in any field (the old per-line `in line` check)."""
+    mask = np.zeros(len(frame), dtype=bool)
+    for col in frame.columns:
+        mask |= frame[col].str.contains(text, regex=False).to_numpy()
+    return mask
+
+
+def fill_level(values, mask, initial=None):
+    """Forward-fill the values of `mask` rows down to the rows that follow them.
+
+    Rows above the first `mask` row get `initial`: the level still open at the
+    end of the previous chunk when a report is read piecewise.
+    """
+    filled = values.where(mask).ffill()
+    return filled if initial is None else filled.fillna(initial)
+
+
+def last_level(filled, previous=None):
+    """The level still open after a forward-filled column (for the next chunk's `initial`)."""
+    return filled.iloc[-1] if len(filled) and pd.notna(filled.iloc[-1]) else previous
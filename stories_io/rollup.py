@@ -0,0 +1,151 @@
+"""
+Materialized rollup cube over the item report's product hierarchy.
+
+df_products rows sit at Branch / Service / Category / Section / Product. The
+rollup holds the PRODUCT_SUMS of every combination of those levels (all 32
+grouping sets, down to the grand total) in one long frame:
+
+    Grouping   bitmask of the grouped LEVELS (bit i set = LEVELS[i] kept)
+    LEVELS     the key of each row; NaN in levels the row is rolled up over
+    PRODUCT_SUMS
+
+Rows are sorted by Grouping, so a query slices its grouping set with a binary
+search and filters that slice instead of grouping the raw rows. Each
+grouping set is aggregated from its smallest already-built parent, not from
+the raw rows. Keys whose sums are all zero are left out. An item row missing
+a level (NaN Service, say) is kept under a NaN key in the grouping sets that
+keep that level, so every set still adds up to the grand total.
+
+`load_rollup_cached` persists the rollup next to the parsed frames in the
+Feather cache, keyed by the item report's digest.
+"""
+
+import os
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from stories_io.analytics import PRODUCT_SUMS
+from stories_io.cache import cache_dir_from_env, feather, write_atomic
+from stories_io.parsers import PARSER_VERSION
+
+LEVELS = ['Branch', 'Service', 'Category', 'Section', 'Product']
+ROLLUP_VERSION = 2
+
+
+def grouping_id(levels):
+    """Grouping bitmask of a collection of LEVELS names."""
+    unknown = set(levels) - set(LEVELS)
+    if unknown:
+        raise KeyError(f'not a product hierarchy level: {sorted(unknown)}')
+    return sum(1 << LEVELS.index(level) for level in levels)
+
+
+def _finish(parts):
+    """Concatenate per-grouping frames into the persisted layout."""
+    rollup = pd.concat(parts, ignore_index=True)
+    for level in LEVELS:
+        rollup[level] = rollup[level].astype('category')
+    rollup = rollup[(rollup[PRODUCT_SUMS].abs() > 1e-6).any(axis=1)]
+    rollup = rollup.sort_values('Grouping', kind='stable').reset_index(drop=True)
+    return rollup[['Grouping'] + LEVELS + PRODUCT_SUMS]
+
+
+def build_rollup(df_products):
+    """Rollup frame of every grouping set of LEVELS (see module docstring)."""
+    values = df_products[PRODUCT_SUMS].astype('float64')
+    finest = (values.groupby([df_products[level] for level in LEVELS], observed=True, dropna=False).sum()
+              .reset_index())
+    built = {grouping_id(LEVELS): finest}
+    # Coarser sets from the smallest built parent: drop one level at a time
+    for k in range(len(LEVELS) - 1, -1, -1):
+        for levels in combinations(LEVELS, k):
+            gid = grouping_id(levels)
+            parent = min((built[gid | 1 << i] for i in range(len(LEVELS)) if not gid >> i & 1), key=len)
+            if levels:
+                built[gid] = (parent.groupby(list(levels), observed=True, dropna=False)[PRODUCT_SUMS]
+                              .sum().reset_index())
+            else:
+                built[gid] = parent[PRODUCT_SUMS].sum().to_frame().T
+    grand, expected = built[0].iloc[0].to_numpy(dtype='float64'), values.sum().to_numpy()
+    if not np.allclose(grand, expected, rtol=1e-9, atol=1e-6):
+        raise ValueError(f'rollup grand total {grand.tolist()} does not match the item rows {expected.tolist()}')
+    parts = [frame.assign(Grouping=gid).reindex(columns=['Grouping'] + LEVELS + PRODUCT_SUMS)
+             for gid, frame in built.items()]
+    return _finish(parts)
+
+
+def combine_rollups(base, delta, sign=1):
+    """`base` + sign * `delta`, matched on Grouping and level keys (for incremental updates)."""
+    delta = delta.copy()
+    delta[PRODUCT_SUMS] = delta[PRODUCT_SUMS] * sign
+    both = pd.concat([base, delta], ignore_index=True)
+    for level in LEVELS:
+        both[level] = both[level].astype(object)
+    summed = both.groupby(['Grouping'] + LEVELS, dropna=False, sort=False)[PRODUCT_SUMS].sum().reset_index()
+    return _finish([summed])
+
+
+def rollup_slice(rollup, levels):
+    """Rows of the grouping set that keeps exactly `levels`."""
+    gid = grouping_id(levels)
+    grouping = rollup['Grouping'].to_numpy()
+    lo, hi = np.searchsorted(grouping, [gid, gid + 1])
+    return rollup.iloc[lo:hi]
+
+
+def query(rollup, by=(), where=None):
+    """PRODUCT_SUMS by the levels `by` among rows matching {level: value or collection of values}.
+
+    Answered from the grouping set of `by` plus the `where` levels, so any
+    roll-up or drill-down is a slice and a filter rather than a groupby; only
+    a multi-value filter needs a (small) groupby to fold the matched keys.
+    """
+    where = where or {}
+    by = list(by)
+    rows = rollup_slice(rollup, set(by) | set(where))
+    mask = np.ones(len(rows), dtype=bool)
+    fold = False
+    for level, value in where.items():
+        if isinstance(value, (list, tuple, set, frozenset)):
+            mask &= rows[level].isin(list(value)).to_numpy()
+            fold = fold or level not in by
+        else:
+            mask &= (rows[level] == value).to_numpy()
+    df = rows.loc[mask, by + PRODUCT_SUMS]
+    if fold:
+        df = (df.groupby(by, observed=True, dropna=False)[PRODUCT_SUMS].sum() if by
+              else df[PRODUCT_SUMS].sum().to_frame().T)
+    df = df.reset_index(drop=not (fold and by))
+    for level in by:
+        df[level] = df[level].astype(str)
+    return df
+
+
+def drill_down(rollup, path, level):
+    """Children at `level` under the {level: value} `path` with margin and average price, most profitable first."""
+    df = query(rollup, by=[level], where=path)
+    df['Profit Margin'] = np.where(df['Revenue'] > 0, df['Total Profit'] / df['Revenue'] * 100, np.nan)
+    df['Avg Price'] = np.where(df['Qty'] > 0, df['Revenue'] / df['Qty'], np.nan)
+    return df.sort_values('Total Profit', ascending=False).reset_index(drop=True)
+
+
+def rollup_cache_path(cache_dir, digest):
+    return os.path.join(cache_dir, f'products_rollup-{digest[:32]}-v{PARSER_VERSION}.{ROLLUP_VERSION}.feather')
+
+
+def load_rollup_cached(df_products, digest, cache_dir=None):
+    """build_rollup(df_products), persisted in the Feather cache under the item report's digest."""
+    cache_dir = cache_dir_from_env() if cache_dir is None else cache_dir
+    if not cache_dir or feather is None:
+        return build_rollup(df_products)
+
+    path = rollup_cache_path(cache_dir, digest)
+    if os.path.exists(path):
+        return feather.read_feather(path, memory_map=True)
+
+    rollup = build_rollup(df_products)
+    os.makedirs(cache_dir, exist_ok=True)
+    write_atomic(rollup, path)
+    return rollup
@@ -0,0 +1,58 @@
+"""
+Row-position index of a parsed frame by its key columns.
+
+Scoping the item report to some branches / service types used to mean a
+boolean scan over every row and a fresh groupby on each dashboard rerun. The
+index maps each observed key combination (e.g. Branch, Service) to the int64
+positions of its rows once per export, so a filter is a concatenation of the
+selected position arrays followed by one `take` of just those k rows.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+RowIndex = namedtuple('RowIndex', 'keys positions')
+RowIndex.__doc__ = """\
+keys          the indexed column names, in key-tuple order
+positions     {key tuple: sorted int64 row positions}
+"""
+
+
+def build_row_index(df, keys):
+    """RowIndex of `df` on the columns `keys`."""
+    keys = tuple(keys)
+    groups = df.groupby(list(keys), observed=True, sort=False).indices
+    positions = {(k if isinstance(k, tuple) else (k,)): np.asarray(v, dtype=np.int64) for k, v in groups.items()}
+    return RowIndex(keys, positions)
+
+
+def key_values(index, key):
+    """Distinct values of one indexed column, in first-seen order."""
+    i = index.keys.index(key)
+    return list(dict.fromkeys(k[i] for k in index.positions))
+
+
+def select(index, **values):
+    """Row positions (ascending) whose keys match `values`.
+
+    Each keyword is an indexed column mapped to one value or a collection of
+    values; columns left out (or None) match anything.
+    """
+    unknown = set(values) - set(index.keys)
+    if unknown:
+        raise KeyError(f'not an indexed column: {sorted(unknown)}')
+    allowed = []
+    for key in index.keys:
+        v = values.get(key)
+        allowed.append(None if v is None else set(v) if isinstance(v, (list, tuple, set, frozenset)) else {v})
+    parts = [pos for k, pos in index.positions.items()
+             if all(a is None or kv in a for a, kv in zip(allowed, k))]
+    if not parts:
+        return np.empty(0, dtype=np.int64)
+    return np.sort(np.concatenate(parts)) if len(parts) > 1 else parts[0]
+
+
+def take(df, index, **values):
+    """The rows of `df` matching `values` (see select), in frame order."""
+    return df.take(select(index, **values))
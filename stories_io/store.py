@@ -0,0 +1,429 @@
+"""
+Partitioned store of parsed reports for month-end incremental ingest.
+
+    <store>/monthly/2026-02-<digest>.feather    long (Year, Branch, Month, Value) rows of one month
+    <store>/products/<period>-<digest>.feather  item report rows of one export period
+    <store>/groups/<period>-<digest>.feather    group report rows of one export period
+    <store>/aggregates-<n>/*.feather            monthly totals, product / group totals, product rollup, jan_compare
+    <store>/manifest.json                       source digest and period of every partition, current aggregates
+
+`init_store` seeds the store from the full-year exports; `ingest_month` then
+adds (or replaces) one month. Product and group totals are updated by
+subtracting the replaced partition and adding the new one (the product
+hierarchy rollup of stories_io.rollup the same way), monthly totals only
+touch the ingested month and the January comparison is rebuilt only when a
+January partition changes, so the work per ingest scales with the new month's
+exports rather than with the history.
+
+An ingest never modifies what the manifest points at: partitions go to new
+file names, and the updated aggregates to a new aggregates-<n> directory
+(hard links of the current one, with the changed files replaced). Renaming
+the new manifest into place commits all of it at once, so an interrupted
+ingest leaves the previous state intact and can simply be run again; one
+that fails removes what it staged.
+
+Product / group periods must not overlap: an export whose header declares
+another period than the one it is ingested as, or one overlapping (or
+identical to) a stored period, is rejected with a ValueError before anything
+is written.
+"""
+
+import json
+import os
+import shutil
+
+import pandas as pd
+
+from stories_io import cube
+from stories_io.analytics import product_totals, group_totals, product_agg, group_summary
+from stories_io.cache import file_digest, write_atomic
+from stories_io.dtypes import (
+    compact, PRODUCT_CATEGORICALS, PRODUCT_FLOAT32, GROUP_CATEGORICALS, GROUP_FLOAT32,
+)
+from stories_io.parsers import (
+    MONTHS, export_period, monthly_wide, parse_monthly_sales_long, parse_product_profit,
+    parse_group_sales,
+)
+from stories_io.rollup import build_rollup, combine_rollups
+
+DEFAULT_STORE_DIR = os.path.join(os.path.expanduser('~'), '.local', 'share', 'stories_coffee', 'store')
+BASE_PERIOD = 'base'
+PARTITIONS = ('monthly', 'products', 'groups')
+
+TOTALS = {
+    'products': ('product_totals', product_totals),
+    'groups': ('group_totals', group_totals),
+}
+COMPACT = {
+    'products': (PRODUCT_CATEGORICALS, PRODUCT_FLOAT32),
+    'groups': (GROUP_CATEGORICALS, GROUP_FLOAT32),
+}
+ITEM_PARSERS = {
+    'products': parse_product_profit,
+    'groups': parse_group_sales,
+}
+
+
+def store_dir_from_env():
+    return os.environ.get('STORIES_STORE_DIR', DEFAULT_STORE_DIR)
+
+
+def period_key(year, month):
+    """'2026-02' for (2026, 'February')."""
+    return f'{int(year)}-{MONTHS.index(month) + 1:02d}'
+
+
+def _partition_path(store_dir, kind, name, digest):
+    return os.path.join(store_dir, kind, f'{name}-{digest[:16]}.feather')
+
+
+def _partition(store_dir, manifest, kind, name):
+    """Path of a stored partition, or None."""
+    digest = manifest[kind].get(name)
+    if digest is None:
+        return None
+    return _partition_path(store_dir, kind, name, digest)
+
+
+def _aggregate_dir(store_dir, manifest):
+    return os.path.join(store_dir, manifest.get('aggregates', 'aggregates'))
+
+
+def _agg_path(agg_dir, name):
+    return os.path.join(agg_dir, f'{name}.feather')
+
+
+def _read(path):
+    return pd.read_feather(path) if path is not None and os.path.exists(path) else None
+
+
+def _write(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_atomic(df.reset_index(drop=True), path)
+
+
+def read_manifest(store_dir):
+    path = os.path.join(store_dir, 'manifest.json')
+    if not os.path.exists(path):
+        return {'monthly': {}, 'products': {}, 'groups': {}, 'coverage': {'products': {}, 'groups': {}}}
+    with open(path) as f:
+        manifest = json.load(f)
+    manifest.setdefault('coverage', {'products': {}, 'groups': {}})
+    return manifest
+
+
+def _write_manifest(store_dir, manifest):
+    path = os.path.join(store_dir, 'manifest.json')
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+# ============================================================
+# TRANSACTIONS
+# ============================================================
+def _stage(store_dir, manifest):
+    """Start an ingest: a copy of the manifest pointing at a fresh aggregates directory.
+
+    The directory holds hard links (copies where links are not supported) of
+    the current aggregates; write_atomic replaces a file rather than writing
+    into it, so updating a staged aggregate leaves the committed one as it was.
+    """
+    staged = json.loads(json.dumps(manifest))
+    staged['generation'] = manifest.get('generation', 0) + 1
+    staged['aggregates'] = f"aggregates-{staged['generation']:05d}"
+    current, new = _aggregate_dir(store_dir, manifest), _aggregate_dir(store_dir, staged)
+    # Left over from an ingest that was interrupted before its commit
+    shutil.rmtree(new, ignore_errors=True)
+    os.makedirs(new)
+    if os.path.isdir(current):
+        for name in os.listdir(current):
+            if not name.endswith('.feather'):
+                continue
+            try:
+                os.link(os.path.join(current, name), os.path.join(new, name))
+            except OSError:
+                shutil.copy2(os.path.join(current, name), os.path.join(new, name))
+    return staged
+
+
+def _commit(store_dir, staged):
+    """Make a staged ingest current (one rename), then drop what it superseded."""
+    _write_manifest(store_dir, staged)
+    _collect(store_dir, staged)
+
+
+def _collect(store_dir, manifest):
+    """Remove aggregates directories and partition files `manifest` does not point at."""
+    current = manifest.get('aggregates', 'aggregates')
+    for name in os.listdir(store_dir):
+        path = os.path.join(store_dir, name)
+        if name.startswith('aggregates') and name != current and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+    for kind in PARTITIONS:
+        keep = {_partition(store_dir, manifest, kind, name) for name in manifest[kind]}
+        part_dir = os.path.join(store_dir, kind)
+        if not os.path.isdir(part_dir):
+            continue
+        for name in os.listdir(part_dir):
+            path = os.path.join(part_dir, name)
+            if path not in keep:
+                os.remove(path)
+
+
+# ============================================================
+# PERIOD CHECKS
+# ============================================================
+def _describe(period):
+    year, month = period
+    return f'all of {year}' if month == 0 else f'{MONTHS[month - 1]} {year}'
+
+
+def _overlaps(a, b):
+    """Whether two (year, month number) periods share a month; month 0 is the whole year."""
+    return a[0] == b[0] and (a[1] == 0 or b[1] == 0 or a[1] == b[1])
+
+
+def _stored_period(manifest, report, name):
+    """(year, month number) a stored partition covers, or None if not known."""
+    period = manifest['coverage'][report].get(name)
+    if period is not None:
+        return tuple(period)
+    if name != BASE_PERIOD:
+        return int(name[:4]), int(name[5:7])
+    return None
+
+
+def _check_period(manifest, report, key, period, source, digest):
+    """Raise ValueError if export `source` would double count rows already in the store."""
+    for name, stored in manifest[report].items():
+        if name == key:
+            continue
+        if stored == digest:
+            raise ValueError(f'{source} is the same export as the stored {report} period {name!r}')
+        covered = _stored_period(manifest, report, name)
+        if covered is not None and _overlaps(period, covered):
+            raise ValueError(f'{source} covers {_describe(period)}, which overlaps the stored '
+                             f'{report} period {name!r} ({_describe(covered)})')
+
+
+# ============================================================
+# AGGREGATE MAINTENANCE
+# ============================================================
+def _read_totals(agg_dir, name):
+    df = _read(_agg_path(agg_dir, name))
+    return None if df is None else df.set_index(df.columns[0])
+
+
+def _write_totals(agg_dir, name, totals):
+    # A key whose every partition has been replaced away sums back to ~0
+    totals = totals[totals['Qty'].abs() > 1e-6]
+    _write(totals.reset_index(), _agg_path(agg_dir, name))
+
+
+def _apply_delta(agg_dir, report, old, new):
+    """Move the report's running totals from partition `old` to partition `new`."""
+    name, totals_fn = TOTALS[report]
+    totals = _read_totals(agg_dir, name)
+    delta = totals_fn(new)
+    if old is not None:
+        delta = delta.sub(totals_fn(old), fill_value=0)
+    totals = delta if totals is None else totals.add(delta, fill_value=0)
+    _write_totals(agg_dir, name, totals)
+
+
+def _apply_rollup_delta(agg_dir, old, new):
+    """Move the product rollup from item partition `old` to partition `new`."""
+    path = _agg_path(agg_dir, 'product_rollup')
+    rollup = _read(path)
+    rollup = build_rollup(new) if rollup is None else combine_rollups(rollup, build_rollup(new))
+    if old is not None:
+        rollup = combine_rollups(rollup, build_rollup(old), sign=-1)
+    _write(rollup, path)
+
+
+def _update_monthly_totals(agg_dir, df_month):
+    """Replace the chain-wide totals of the months present in `df_month`."""
+    path = _agg_path(agg_dir, 'monthly_totals')
+    revenue_cube = cube.build_cube(monthly_wide(df_month))
+    keys = set(zip(df_month['Year'], df_month['Month']))
+    new = pd.DataFrame([(year, month, total) for year in revenue_cube.years
+                        for month, total in cube.monthly_totals(revenue_cube, year).items()
+                        if (year, month) in keys], columns=['Year', 'Month', 'Value'])
+    old = _read(path)
+    if old is not None:
+        keys = pd.MultiIndex.from_frame(new[['Year', 'Month']])
+        old = old[~pd.MultiIndex.from_frame(old[['Year', 'Month']]).isin(keys)]
+        new = pd.concat([old, new], ignore_index=True)
+    order = new['Month'].map(MONTHS.index)
+    _write(new.assign(_order=order).sort_values(['Year', '_order']).drop(columns='_order'), path)
+
+
+def _refresh_jan_compare(store_dir, manifest):
+    """Rebuild jan_compare from the two latest January partitions."""
+    years = sorted(int(k[:4]) for k in manifest['monthly'] if k.endswith('-01'))
+    if len(years) < 2:
+        return
+    prev_year, curr_year = years[-2:]
+    prev = _read(_partition(store_dir, manifest, 'monthly', period_key(prev_year, 'January')))
+    curr = _read(_partition(store_dir, manifest, 'monthly', period_key(curr_year, 'January')))
+    revenue_cube = cube.build_cube(monthly_wide(pd.concat([prev, curr], ignore_index=True)))
+    jan = cube.month_compare(revenue_cube, prev_year, curr_year)
+    _write(jan, _agg_path(_aggregate_dir(store_dir, manifest), 'jan_compare'))
+
+
+# ============================================================
+# INGEST
+# ============================================================
+def _store_months(store_dir, staged, df_long, digest):
+    """Write one partition per (Year, Month) of a long monthly frame."""
+    df_long = df_long[df_long['Month'] != 'Total By Year']
+    for (year, month), part in df_long.groupby(['Year', 'Month'], sort=False):
+        key = period_key(year, month)
+        _write(part, _partition_path(store_dir, 'monthly', key, digest))
+        staged['monthly'][key] = digest
+    _update_monthly_totals(_aggregate_dir(store_dir, staged), df_long)
+
+
+def _store_items(store_dir, committed, staged, report, period, df, digest, covers):
+    """Write an item / group partition, then move the staged aggregates onto it."""
+    _write(df, _partition_path(store_dir, report, period, digest))
+    old = _read(_partition(store_dir, committed, report, period))
+    agg_dir = _aggregate_dir(store_dir, staged)
+    _apply_delta(agg_dir, report, old, df)
+    if report == 'products':
+        _apply_rollup_delta(agg_dir, old, df)
+    staged[report][period] = digest
+    staged['coverage'][report][period] = None if covers is None else list(covers)
+
+
+def init_store(store_dir, sources):
+    """Seed an empty store from full-year exports (report key -> path)."""
+    manifest = read_manifest(store_dir)
+    if any(manifest[kind] for kind in PARTITIONS):
+        raise FileExistsError(f'store already initialised: {store_dir}')
+    os.makedirs(store_dir, exist_ok=True)
+    staged = _stage(store_dir, manifest)
+
+    try:
+        if 'monthly' in sources:
+            _store_months(store_dir, staged, parse_monthly_sales_long(sources['monthly']),
+                          file_digest(sources['monthly']))
+            _refresh_jan_compare(store_dir, staged)
+        for report in ('products', 'groups'):
+            if report in sources:
+                _store_items(store_dir, manifest, staged, report, BASE_PERIOD,
+                             ITEM_PARSERS[report](sources[report]), file_digest(sources[report]),
+                             export_period(sources[report]))
+    except BaseException:
+        # The manifest still names the previous state; drop what was staged
+        _collect(store_dir, manifest)
+        raise
+    _commit(store_dir, staged)
+    return staged
+
+
+def ingest_month(store_dir, year, month, sources):
+    """Add or replace one month's exports (report key -> path).
+
+    Returns the names of the aggregates that were recomputed; a source whose
+    digest matches the stored partition is skipped. Raises ValueError, with
+    the store untouched, for an item / group export that is not of this month
+    or overlaps a stored period.
+    """
+    manifest = read_manifest(store_dir)
+    key = period_key(year, month)
+    month_period = (int(year), MONTHS.index(month) + 1)
+
+    items = {}
+    for report in ('products', 'groups'):
+        if report not in sources:
+            continue
+        digest = file_digest(sources[report])
+        if manifest[report].get(key) == digest:
+            continue
+        declared = export_period(sources[report])
+        if declared is not None and declared != month_period:
+            raise ValueError(f'{sources[report]} covers {_describe(declared)}, not {month} {year}')
+        _check_period(manifest, report, key, month_period, sources[report], digest)
+        items[report] = digest
+
+    df_month = None
+    if 'monthly' in sources:
+        monthly_digest = file_digest(sources['monthly'])
+        if manifest['monthly'].get(key) != monthly_digest:
+            df_long = parse_monthly_sales_long(sources['monthly'])
+            df_month = df_long[(df_long['Year'] == year) & (df_long['Month'] == month)]
+            if df_month.empty:
+                raise ValueError(f'{month} {year} not found in {sources["monthly"]}')
+    if df_month is None and not items:
+        return []
+
+    staged = _stage(store_dir, manifest)
+    refreshed = []
+    try:
+        if df_month is not None:
+            _store_months(store_dir, staged, df_month, monthly_digest)
+            refreshed.append('monthly_totals')
+            if month == 'January':
+                _refresh_jan_compare(store_dir, staged)
+                refreshed.append('jan_compare')
+
+        for report, digest in items.items():
+            _store_items(store_dir, manifest, staged, report, key, ITEM_PARSERS[report](sources[report]),
+                         digest, month_period)
+            refreshed.append(TOTALS[report][0])
+    except BaseException:
+        _collect(store_dir, manifest)
+        raise
+    _commit(store_dir, staged)
+    return refreshed
+
+
+# ============================================================
+# READ BACK
+# ============================================================
+def load_aggregates(store_dir):
+    """The persisted aggregates in the shape analysis.py builds them."""
+    agg_dir = _aggregate_dir(store_dir, read_manifest(store_dir))
+    out = {}
+    monthly = _read(_agg_path(agg_dir, 'monthly_totals'))
+    if monthly is not None:
+        out['monthly_totals'] = monthly
+    products = _read_totals(agg_dir, 'product_totals')
+    if products is not None:
+        out['df_prod_agg'] = product_agg(products)
+    rollup = _read(_agg_path(agg_dir, 'product_rollup'))
+    if rollup is not None:
+        out['product_rollup'] = rollup
+    groups = _read_totals(agg_dir, 'group_totals')
+    if groups is not None:
+        out['df_group_summary'] = group_summary(groups)
+    jan = _read(_agg_path(agg_dir, 'jan_compare'))
+    if jan is not None:
+        out['jan_compare'] = jan
+    return out
+
+
+def load_store(store_dir):
+    """Every partition concatenated back into df_monthly (wide) / df_products / df_groups."""
+    manifest = read_manifest(store_dir)
+    frames = {}
+
+    if manifest['monthly']:
+        df_long = pd.concat([_read(_partition(store_dir, manifest, 'monthly', k)) for k in sorted(manifest['monthly'])],
+                            ignore_index=True)
+        # Total By Year is the sum of the stored months
+        totals = (df_long.groupby(['Year', 'Branch'], sort=False, as_index=False)['Value'].sum()
+                  .assign(Month='Total By Year'))
+        frames['monthly'] = monthly_wide(pd.concat([df_long, totals], ignore_index=True))
+
+    for report in ('products', 'groups'):
+        if manifest[report]:
+            df = pd.concat([_read(_partition(store_dir, manifest, report, k)) for k in sorted(manifest[report])],
+                           ignore_index=True)
+            frames[report] = compact(df, *COMPACT[report])
+    return frames
@@ -0,0 +1,131 @@
+"""
+Page-chunked reading of the hierarchical exports, for files larger than memory.
+
+    manifest = write_parts('products', 'rep_s_00014_SMRY.csv', 'parts/')
+    for df in iter_parts('parts/', 'products'):   # one part in memory at a time
+        ...
+    df = read_parts('parts/', 'products')         # or everything, as parse_product_profit returns it
+
+    <out_dir>/<report>/part-00000.feather   rows parsed from one run of `pages` export pages
+    <out_dir>/<report>/manifest.json        source digest, parser version, pages and rows of every part
+
+The POS exporter starts every page with a "Page N of" header row, so the
+file is cut there: each chunk of pages is tokenized into a string frame and
+run through the same vectorized rows builder as the whole-file parser, with
+the branch / service / category / section levels still open at the end of
+the previous chunk carried into it. Only one chunk's lines and frame are in
+memory at a time, whatever the file size. The monthly report (REP_S_00134)
+is already read line by line by iter_monthly_sales and yields a few rows per
+branch and year, so it is not chunked.
+"""
+
+import io
+import json
+import os
+import re
+
+import pandas as pd
+
+from stories_io.cache import file_digest, write_atomic
+from stories_io.dtypes import compact
+from stories_io.parsers import ROW_BUILDERS, PARSER_VERSION, _open_text
+from stories_io.reader import read_report_frame
+
+# ~36 lines a page: 256 pages is ~9k lines, a few MB of string frame
+DEFAULT_PAGES = 256
+PAGE_HEADER = re.compile(r'Page (\d+) of')
+
+
+def iter_page_chunks(source, pages=DEFAULT_PAGES):
+    """Yield (first page, last page, lines) for every run of `pages` pages of an export.
+
+    Lines above the first page header (the report title) go with the first chunk.
+    """
+    lines, numbers = [], []
+    with _open_text(source) as f:
+        for line in f:
+            match = PAGE_HEADER.search(line)
+            if match:
+                if len(numbers) == pages:
+                    yield numbers[0], numbers[-1], lines
+                    lines, numbers = [], []
+                numbers.append(int(match.group(1)))
+            lines.append(line)
+    if any(line.strip() for line in lines):
+        yield (numbers[0] if numbers else None), (numbers[-1] if numbers else None), lines
+
+
+def iter_chunks(report, source, pages=DEFAULT_PAGES):
+    """Yield (first page, last page, rows) per chunk of pages, rows compacted like the parser's."""
+    build, width, dtypes = ROW_BUILDERS[report]
+    levels = {}
+    for first, last, lines in iter_page_chunks(source, pages):
+        raw = read_report_frame(io.StringIO(''.join(lines)), width)
+        df, levels = build(raw, levels)
+        if dtypes:
+            compact(df, *dtypes)
+        yield first, last, df
+
+
+def _report_dir(out_dir, report):
+    return os.path.join(out_dir, report)
+
+
+def read_manifest(out_dir, report):
+    path = os.path.join(_report_dir(out_dir, report), 'manifest.json')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_parts(report, source, out_dir, pages=DEFAULT_PAGES):
+    """Stream export `source` (a path) into part files under out_dir/report and return the manifest.
+
+    Parts already written from the same file content, parser version and
+    chunk size are kept as they are.
+    """
+    digest = file_digest(source)
+    manifest = read_manifest(out_dir, report)
+    if manifest and (manifest['digest'], manifest['parser_version'], manifest['pages']) == (digest, PARSER_VERSION, pages):
+        return manifest
+
+    part_dir = _report_dir(out_dir, report)
+    os.makedirs(part_dir, exist_ok=True)
+    for name in os.listdir(part_dir):
+        if name.startswith('part-'):
+            os.remove(os.path.join(part_dir, name))
+
+    parts = []
+    for number, (first, last, df) in enumerate(iter_chunks(report, source, pages)):
+        name = f'part-{number:05d}.feather'
+        write_atomic(df.reset_index(drop=True), os.path.join(part_dir, name))
+        parts.append({'file': name, 'first_page': first, 'last_page': last, 'rows': len(df)})
+
+    manifest = {
+        'report': report, 'source': os.path.abspath(source), 'digest': digest,
+        'parser_version': PARSER_VERSION, 'pages': pages,
+        'rows': sum(p['rows'] for p in parts), 'parts': parts,
+    }
+    path = os.path.join(part_dir, 'manifest.json')
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + '.tmp', path)
+    return manifest
+
+
+def iter_parts(out_dir, report):
+    """The part frames of a written report, in file order."""
+    manifest = read_manifest(out_dir, report)
+    if manifest is None:
+        raise FileNotFoundError(f'no parts for {report} in {out_dir}')
+    for part in manifest['parts']:
+        yield pd.read_feather(os.path.join(_report_dir(out_dir, report), part['file']))
+
+
+def read_parts(out_dir, report):
+    """Every part concatenated back into the frame the whole-file parser returns."""
+    df = pd.concat(iter_parts(out_dir, report), ignore_index=True)
+    dtypes = ROW_BUILDERS[report][2]
+    # Each part has its own categories; concat falls back to object columns
+    return compact(df, *dtypes) if dtypes else df
@@ -0,0 +1,41 @@
+"""
+CSV tokenizer for the POS exports.
+
+The exports are plain CSV with quoted thousands separators ("1,234.50"). The
+C `csv` reader splits them like the old per-line lookahead regex did, without
+rescanning the rest of the line at every comma, and also handles a quoted
+field that runs over several lines: `tokenize_lines` yields it as one row,
+paired with every source line it was read from.
+"""
+
+import csv
+
+
+def split_line(line):
+    """Split one stripped export line into trimmed fields."""
+    return [p.strip() for p in next(csv.reader([line]))]
+
+
+def tokenize_lines(lines):
+    """Yield (line, parts) for every non-blank line of an open export file.
+
+    `line` is the stripped raw line (the loaders still use it for their
+    page-header checks) and `parts` the trimmed, unquoted fields. A quoted
+    field spanning lines makes one row whose `line` is its lines joined
+    with newlines.
+    """
+    pending = []
+
+    def stripped():
+        for raw in lines:
+            line = raw.strip()
+            if line:
+                pending.append(line)
+                yield line + '\n'
+
+    # The reader pulls lines only up to the end of the row it returns, so
+    # `pending` holds exactly that row's lines
+    for parts in csv.reader(stripped()):
+        line = '\n'.join(pending)
+        pending.clear()
+        yield line, [p.strip() for p in parts]